@@ -4,6 +4,7 @@ import re
 import subprocess
 import tempfile
 import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Optional, Dict, Any
 
 import fitz  # PyMuPDF
@@ -11,12 +12,15 @@ import pandas as pd
 from docx import Document as DocxDocument
 from jnd_utils.log import init_logging
 
-from src.models.unified_tender import ParsedContent, ParsedDocumentData, UnifiedTenderRecord
+from src.models.unified_tender import ParsedContent, ParsedDocumentData, UnifiedTenderRecord, ProcessingStage
 from src.utils.file_utils import FileType, get_file_type
 from src.utils.http_client import HttpClient
 
 logger = logging.getLogger(__name__)
 
+# Documents downloaded concurrently while earlier ones are being parsed
+MAX_DOWNLOAD_WORKERS = 8
+
 
 def convert_doc_to_docx(path: str) -> str:
     """Convert a .doc file to .docx format using LibreOffice."""
@@ -329,19 +333,27 @@ class DocumentsParser:
             full_text=""
         )
 
-    def _process_document(self, doc: Dict[str, Any]) -> None:
-        """Process a single document."""
+    def _fetch_document(self, doc: Dict[str, Any]) -> str:
+        """Validate document information and download the document, returning the local path."""
+        doc_id = doc.get('id', 'unknown')
+        name = doc.get("file")
+        url = doc.get("download_link")
+
+        if not all([doc_id, name, url]):
+            logger.error(f"Missing required document information for {doc_id}")
+            raise ValueError("Missing required document information")
+
+        return self._download_file(name, url)
+
+    def _process_document(self, doc: Dict[str, Any], download: Future) -> None:
+        """Process a single document once its download (a _fetch_document future) completes."""
         doc_id = doc.get('id', 'unknown')
         logger.info(f"Processing document: {doc_id}")
         try:
             name = doc.get("file")
             url = doc.get("download_link")
 
-            if not all([doc_id, name, url]):
-                logger.error(f"Missing required document information for {doc_id}")
-                raise ValueError("Missing required document information")
-
-            path = self._download_file(name, url)
+            path = download.result()
             ext = os.path.splitext(name)[-1].lower()
             file_type = get_file_type(ext)
 
@@ -424,13 +436,17 @@ class DocumentsParser:
     def _process_all_documents(self) -> None:
         """Process all documents in the document_infos list."""
         logger.info(f"Processing {len(self.document_infos)} documents")
-        for doc in self.document_infos:
-            self._process_document(doc)
+        # Downloads are I/O bound and run in the pool; parsing stays on this thread in the original
+        # order (PyMuPDF is not thread-safe), picking up each document as soon as it is downloaded
+        max_workers = max(1, min(MAX_DOWNLOAD_WORKERS, len(self.document_infos)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            downloads = [executor.submit(self._fetch_document, doc) for doc in self.document_infos]
+            for doc, download in zip(self.document_infos, downloads):
+                self._process_document(doc, download)
         logger.info("Completed processing all documents")
 
         # Update tender record processing stage if available
         if self.tender_record:
-            from src.models.unified_tender import ProcessingStage
             self.tender_record.processing_stage = ProcessingStage.DOCUMENTS_PARSED
 
     def get_documents_data(self) -> List[ParsedDocumentData]:
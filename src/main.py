@@ -6,7 +6,7 @@ from jnd_utils.log import init_logging
 
 from src.database import tender_database
 from src.scrapers.nen_scraper import NenScraper
-from src.tender_pipeline import TenderProcessingPipeline
+from src.tender_pipeline import TenderProcessingPipeline, FailedTender
 from src.vector_search.base import VectorSearch
 from src.vector_search.collections import tender_indexes, company_indexes
 
@@ -22,6 +22,7 @@ def main():
             'companies': company_indexes
         }
     )
+    vector_search.connect()
 
     # Create collections
     vector_search.create_collection("tenders_czech")
@@ -67,6 +68,9 @@ def main():
             source_data=test_item_scraped,
 
         )
+        if isinstance(unified_tender, FailedTender):
+            # The tender keeps the stages it reached, pipeline.resume_processing(unified_tender.tender) retries the rest
+            print(f"❌ Processing failed at stage '{unified_tender.failed_stage.value}': {unified_tender.error}")
 
     except Exception as e:
         print(f"❌ Processing failed: {e}")
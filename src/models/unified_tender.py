@@ -10,6 +10,7 @@ class ProcessingStage(Enum):
     UNIFIED_MAPPED = "unified_mapped"
     DOCUMENTS_PARSED = "documents_parsed"
     SEMANTIC_PROCESSED = "semantic_processed"
+    DATABASE_SAVED = "database_saved"
     VECTOR_INDEXED = "vector_indexed"
     COMPLETED = "completed"
 
@@ -377,6 +378,10 @@ class UnifiedTenderRecord:
 
         return [doc for doc in self.parsed_documents if doc.id in document_ids]
 
+    def _llm_extracted(self):
+        """LLM-extracted semantic data, or None if the tender has not been semantically processed"""
+        return self.semantic_data.llm_extracted if self.semantic_data else None
+
     def _create_primary_search_text(self) -> List[str]:
         # --- PRIMARY FIELDS (highest weight, repeated 3x) ---
         primary_fields = []
@@ -385,14 +390,13 @@ class UnifiedTenderRecord:
             primary_fields.append(f"Title: {self.title}")
 
         # Updated to use semantic_data.llm_extracted structure
-        if self.semantic_data and self.semantic_data.llm_extracted:
-            if self.semantic_data.llm_extracted.executive_summary:
-                primary_fields.append(
-                    f"Executive summary: {self.semantic_data.llm_extracted.executive_summary}")
+        llm_extracted = self._llm_extracted()
+        if llm_extracted:
+            if llm_extracted.executive_summary:
+                primary_fields.append(f"Executive summary: {llm_extracted.executive_summary}")
 
-            if self.semantic_data.llm_extracted.scope_and_deliverables:
-                primary_fields.append(
-                    f"Scope and deliverables: {self.semantic_data.llm_extracted.scope_and_deliverables}")
+            if llm_extracted.scope_and_deliverables:
+                primary_fields.append(f"Scope and deliverables: {llm_extracted.scope_and_deliverables}")
 
         return primary_fields
 
@@ -404,22 +408,22 @@ class UnifiedTenderRecord:
             secondary_fields.append(f"Description: {self.description}")
 
         # Updated to use semantic_data.llm_extracted structure
-        if self.semantic_data and self.semantic_data.llm_extracted:
-            if self.semantic_data.llm_extracted.key_technologies_or_skills:
-                technologies = ', '.join(self.semantic_data.llm_extracted.key_technologies_or_skills)
+        llm_extracted = self._llm_extracted()
+        if llm_extracted:
+            if llm_extracted.key_technologies_or_skills:
+                technologies = ', '.join(llm_extracted.key_technologies_or_skills)
                 secondary_fields.append(f"Required technologies: {technologies}")
 
-            if self.semantic_data.llm_extracted.target_vendor_profile:
-                secondary_fields.append(
-                    f"Target vendor profile: {self.semantic_data.llm_extracted.target_vendor_profile}")
+            if llm_extracted.target_vendor_profile:
+                secondary_fields.append(f"Target vendor profile: {llm_extracted.target_vendor_profile}")
 
-            if self.semantic_data.llm_extracted.searchable_keywords:
-                keywords = ', '.join(self.semantic_data.llm_extracted.searchable_keywords)
+            if llm_extracted.searchable_keywords:
+                keywords = ', '.join(llm_extracted.searchable_keywords)
                 secondary_fields.append(f"Keywords: {keywords}")
 
             # Add semantic tags if available
-            if self.semantic_data.llm_extracted.semantic_tags:
-                tags = self.semantic_data.llm_extracted.semantic_tags
+            if llm_extracted.semantic_tags:
+                tags = llm_extracted.semantic_tags
                 if tags.technology_stack:
                     tech_stack = ', '.join(tags.technology_stack)
                     secondary_fields.append(f"Technology stack: {tech_stack}")
@@ -445,40 +449,32 @@ class UnifiedTenderRecord:
         if self.cpv_description:
             tertiary_fields.append(f"CPV: {self.cpv_description}")
 
-        # Add matching profile information
-        if self.semantic_data and self.semantic_data.llm_extracted and self.semantic_data.llm_extracted.matching_profile:
-            profile = self.semantic_data.llm_extracted.matching_profile
-            if profile.complexity_category:
-                tertiary_fields.append(f"Complexity: {profile.complexity_category}")
-            if profile.tender_size_category:
-                tertiary_fields.append(f"Size category: {profile.tender_size_category}")
+        llm_extracted = self._llm_extracted()
+        if llm_extracted:
+            # Add matching profile information
+            profile = llm_extracted.matching_profile
+            if profile:
+                if profile.complexity_category:
+                    tertiary_fields.append(f"Complexity: {profile.complexity_category}")
+                if profile.tender_size_category:
+                    tertiary_fields.append(f"Size category: {profile.tender_size_category}")
 
-        # Add additional semantic classifications
-        if self.semantic_data and self.semantic_data.llm_extracted:
-            if self.semantic_data.llm_extracted.evaluation_criteria_summary:
-                tertiary_fields.append(
-                    f"Evaluation criteria: {self.semantic_data.llm_extracted.evaluation_criteria_summary}")
+            # Add additional semantic classifications
+            if llm_extracted.evaluation_criteria_summary:
+                tertiary_fields.append(f"Evaluation criteria: {llm_extracted.evaluation_criteria_summary}")
 
-            if self.semantic_data.llm_extracted.budget_and_timeline_context:
-                tertiary_fields.append(
-                    f"Budget and timeline: {self.semantic_data.llm_extracted.budget_and_timeline_context}")
+            if llm_extracted.budget_and_timeline_context:
+                tertiary_fields.append(f"Budget and timeline: {llm_extracted.budget_and_timeline_context}")
 
         return tertiary_fields
 
-    def create_search_text(self) -> List[str]:
-        # Combine all field groups with appropriate weighting
-        search_text_parts = []
-
-        # Add primary fields three times (highest weight)
-        for _ in range(3):
-            search_text_parts.extend(self._create_primary_search_text())
-
-        # Add secondary fields twice (medium weight)
-        for _ in range(2):
-            search_text_parts.extend(self._create_secondary_fields())
-
-        # Add tertiary fields once (basic weight)
-        search_text_parts.extend(self._create_tertiary_fields())
+    def create_search_text(self) -> str:
+        # Combine all field groups with appropriate weighting; each group is built once and repeated
+        search_text_parts = (
+            self._create_primary_search_text() * 3  # highest weight
+            + self._create_secondary_fields() * 2  # medium weight
+            + self._create_tertiary_fields()  # basic weight
+        )
 
         # Create final search text
         return "\n\n".join(filter(None, search_text_parts))
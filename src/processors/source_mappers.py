@@ -1,7 +1,7 @@
 import logging
 import re
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 
 from ..models.unified_tender import UnifiedTenderRecord, ProcessingStage, TenderItem
@@ -9,6 +9,20 @@ from ..scrapers.nen_scraper import NenContractDetail
 
 logger = logging.getLogger(__name__)
 
+# Supported datetime formats, each with a shape pattern checked before the (much slower) strptime
+# call, so a string is only parsed with the formats it can match. Patterns are as permissive as
+# strptime itself: unpadded numbers, space-padded day, month and 12-hour fields (\s?\d{1,2}, e.g.
+# '2025-05- 6') and any whitespace run where the format has a space
+DATETIME_FORMATS = tuple((re.compile(pattern), fmt) for pattern, fmt in (
+    (r'\s?\d{1,2}/\s?\d{1,2}/\d{4},\s+\d{1,2}:\d{1,2}\s+[AaPp][Mm]', '%m/%d/%Y, %I:%M %p'),  # 05/26/2025, 09:00 AM
+    (r'\s?\d{1,2}/\s?\d{1,2}/\d{4},\s+\d{1,2}:\d{1,2}\s+[AaPp][Mm]', '%d/%m/%Y, %I:%M %p'),  # 26/05/2025, 09:00 AM
+    (r'\d{4}-\s?\d{1,2}-\s?\d{1,2}\s+\d{1,2}:\d{1,2}:\d{1,2}', '%Y-%m-%d %H:%M:%S'),  # 2025-05-26 09:00:00
+    (r'\d{4}-\s?\d{1,2}-\s?\d{1,2}', '%Y-%m-%d'),  # 2025-05-26
+    (r'\s?\d{1,2}\.\s?\d{1,2}\.\d{4}\s+\d{1,2}:\d{1,2}', '%d.%m.%Y %H:%M'),  # 26.05.2025 09:00
+    (r'\s?\d{1,2}\.\s?\d{1,2}\.\d{4}', '%d.%m.%Y'),  # 26.05.2025
+    (r'\s?\d{1,2}\.\s+\d{1,2}\.\s+\d{4}\s+\d{1,2}:\d{1,2}', '%d. %m. %Y %H:%M'),  # 15. 05. 2025 09:30
+))
+
 
 class BaseSourceMapper(ABC):
     """Abstract base class for mapping source-specific data to unified model"""
@@ -28,21 +42,15 @@ class BaseSourceMapper(ABC):
         if not date_str:
             return None
 
-        formats = [
-            '%m/%d/%Y, %I:%M %p',  # 05/26/2025, 09:00 AM
-            '%d/%m/%Y, %I:%M %p',  # 26/05/2025, 09:00 AM
-            '%Y-%m-%d %H:%M:%S',  # 2025-05-26 09:00:00
-            '%Y-%m-%d',  # 2025-05-26
-            '%d.%m.%Y %H:%M',  # 26.05.2025 09:00
-            '%d.%m.%Y',  # 26.05.2025
-            '%d. %m. %Y %H:%M',  # 15. 05. 2025 09:30
-        ]
-
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except (ValueError, TypeError):
-                continue
+        if isinstance(date_str, str):
+            for pattern, fmt in DATETIME_FORMATS:
+                if not pattern.fullmatch(date_str):
+                    continue
+                try:
+                    return datetime.strptime(date_str, fmt)
+                except ValueError:
+                    # Right shape but invalid values (e.g. a day-first date tried as month-first)
+                    continue
 
         logger.warning(f"Could not parse date: {date_str}")
         return None
@@ -230,7 +238,7 @@ class NenMapper(BaseSourceMapper):
 
             # Processing metadata
             processing_stage=ProcessingStage.RAW_SCRAPED,
-            scraped_at=datetime.utcnow()
+            scraped_at=datetime.now(timezone.utc)
         )
 
 
@@ -1,15 +1,32 @@
 import logging
-from datetime import datetime
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from typing import List, Optional, Any, Literal, Union
 
 from database_tools.adapters.postgresql import PostgresqlAdapter
 
 from src.agents.tender_llm_extractor import TenderExtractorCZ
+from src.documents_parser import DocumentsParser
 from src.models.unified_tender import UnifiedTenderRecord, ProcessingStage
 from src.processors.source_mappers import SourceMapperRegistry
 
 logger = logging.getLogger(__name__)
 
+# Position of each stage in the pipeline, used to skip stages already reached on retry
+_STAGE_ORDER = {stage: index for index, stage in enumerate(ProcessingStage)}
+_COMPLETED = ProcessingStage.COMPLETED
+# Delay before the first retry of failed tenders, doubled on every further attempt
+RETRY_BACKOFF_SECONDS = 2
+
+
+@dataclass
+class FailedTender:
+    """Tender that failed a pipeline stage; can be resumed with TenderProcessingPipeline.resume_processing"""
+    tender: UnifiedTenderRecord
+    failed_stage: ProcessingStage
+    error: str
+
 
 class TenderProcessingPipeline:
     """
@@ -42,7 +59,7 @@ class TenderProcessingPipeline:
                             source_data: Literal["NEN", "VZZ", "TED"],
                             skip_documents: bool = False,
                             skip_llm: bool = False,
-                            skip_vector_search: bool = False) -> UnifiedTenderRecord:
+                            skip_vector_search: bool = False) -> Union[UnifiedTenderRecord, FailedTender]:
         """
         Process tender from any source through the complete pipeline
         
@@ -54,7 +71,7 @@ class TenderProcessingPipeline:
             skip_vector_search: Skip vector search indexing
             
         Returns:
-            Fully processed UnifiedTenderRecord
+            Fully processed UnifiedTenderRecord, or FailedTender if a stage failed
         """
         logger.info(f"Starting pipeline processing for {source_name} tender")
 
@@ -62,42 +79,90 @@ class TenderProcessingPipeline:
         unified_tender = SourceMapperRegistry.map_to_unified(source_name, source_data)
         logger.info(f"Mapped {source_name} data to unified format: {unified_tender.tender_id}")
 
-        # Step 2: Parse documents (if available and not skipped)
-        if not skip_documents and unified_tender.is_documents_available:
-            unified_tender = self._parse_documents(unified_tender)
-
-        # Step 3: Extract semantic data with LLM (if not skipped)
-        if not skip_llm:
-            unified_tender = self._extract_semantic_data(unified_tender, source_name)
-
-        # Step 4: Save to database
-        if self.database:
-            self._save_to_database(unified_tender)
+        return self.resume_processing(
+            unified_tender,
+            skip_documents=skip_documents,
+            skip_llm=skip_llm,
+            skip_vector_search=skip_vector_search
+        )
+
+    def resume_processing(self,
+                          tender: UnifiedTenderRecord,
+                          skip_documents: bool = False,
+                          skip_llm: bool = False,
+                          skip_vector_search: bool = False) -> Union[UnifiedTenderRecord, FailedTender]:
+        """
+        Run the remaining pipeline stages for an already mapped tender.
+        Stages the tender has already reached are skipped, so a FailedTender
+        can be retried without repeating e.g. the LLM extraction.
 
-        # Step 5: Index in vector search
-        if self.vector_search and not skip_vector_search and unified_tender.semantic_data:
-            unified_tender = self._index_in_vector_search(unified_tender)
+        Returns:
+            Fully processed UnifiedTenderRecord, or FailedTender if a stage failed
+        """
+        failed_tender = self._run_stages(tender, skip_documents, skip_llm, skip_vector_search)
+        if failed_tender:
+            return failed_tender
+        return self._complete(tender)
+
+    def _run_stages(self,
+                    tender: UnifiedTenderRecord,
+                    skip_documents: bool,
+                    skip_llm: bool,
+                    skip_vector_search: bool) -> Optional[FailedTender]:
+        """
+        Run the enabled stages the tender has not reached yet
+        Returns:
+            FailedTender for the first failed stage, or None if all stages succeeded
+        """
+        steps = [
+            # Step 2: Parse documents (if available and not skipped)
+            (ProcessingStage.DOCUMENTS_PARSED,
+             not skip_documents and tender.is_documents_available,
+             self._parse_documents),
+            # Step 3: Extract semantic data with LLM (if not skipped)
+            (ProcessingStage.SEMANTIC_PROCESSED,
+             not skip_llm,
+             self._extract_semantic_data),
+            # Step 4: Save to database - not a stage until _save_to_database stores the tender
+            # Step 5: Index in vector search
+            (ProcessingStage.VECTOR_INDEXED,
+             bool(self.vector_search) and not skip_vector_search,
+             self._index_in_vector_search),
+        ]
+
+        for stage, enabled, step in steps:
+            if not enabled or _STAGE_ORDER[tender.processing_stage] >= _STAGE_ORDER[stage]:
+                continue
+            try:
+                step(tender)
+            except Exception as e:
+                error_msg = f"Stage '{stage.value}' failed for {tender.tender_id}: {e}"
+                logger.error(error_msg)
+                tender.add_processing_error(error_msg)
+                return FailedTender(tender=tender, failed_stage=stage, error=str(e))
+        return None
 
-        unified_tender.processing_stage = ProcessingStage.COMPLETED  # TODO handle this for retries
-        unified_tender.processed_at = datetime.utcnow()
+    @staticmethod
+    def _complete(tender: UnifiedTenderRecord) -> UnifiedTenderRecord:
+        """Mark a tender whose stages all succeeded as completed"""
+        tender.processing_stage = _COMPLETED
+        tender.processed_at = datetime.now(timezone.utc)
 
-        logger.info(f"Completed pipeline processing for {unified_tender.tender_id}")
-        return unified_tender
+        logger.info(f"Completed pipeline processing for {tender.tender_id}")
+        return tender
 
     @staticmethod
-    def _parse_documents(tender: UnifiedTenderRecord) -> UnifiedTenderRecord:
+    def _parse_documents(tender: UnifiedTenderRecord) -> None:
         """Parse documents for the tender using the integrated DocumentsParser."""
         if not tender.document_infos:
             logger.warning(f"No documents to parse for tender {tender.tender_id}")
             tender.add_processing_warning("No documents available for parsing")
-            return tender
+            return
 
         try:
             logger.info(f"Parsing {len(tender.document_infos)} documents for tender {tender.tender_id}")
 
             # Use the integrated class method to parse documents directly for the tender
-            from src.documents_parser import DocumentsParser
-
             DocumentsParser.parse_documents_for_tender(tender)
 
             # Documents are automatically added to the tender record during parsing
@@ -106,72 +171,83 @@ class TenderProcessingPipeline:
             # Update processing stage
             tender.processing_stage = ProcessingStage.DOCUMENTS_PARSED
 
-            return tender
-
         except Exception as e:
+            # Not fatal, the tender is processed further without its documents
             error_msg = f"Document parsing failed: {str(e)}"
             logger.error(error_msg)
             tender.add_processing_error(error_msg)
-            return tender
 
-    def _extract_semantic_data(self, tender: UnifiedTenderRecord, source_name: str) -> UnifiedTenderRecord:
+    def _extract_semantic_data(self, tender: UnifiedTenderRecord) -> None:
         """Extract semantic data using LLM"""
-        lang = 'cz' if source_name == "NEN" else 'en'
-
-        try:
-            logger.info(f"Extracting semantic data for {tender.tender_id}")
+        lang = 'cz' if tender.source_system == "NEN" else 'en'
 
-            # Prepare metadata for LLM
-            metadata = tender.prepare_metadata_for_llm()
+        logger.info(f"Extracting semantic data for {tender.tender_id}")
 
-            # Use parsed documents if available, otherwise empty list
-            documents = tender.parsed_documents if tender.is_documents_parsed else []
+        # Prepare metadata for LLM
+        metadata = tender.prepare_metadata_for_llm()
 
-            # Extract semantic data
-            extractor = self._get_tender_extractor(language=lang)
-            semantic_data = extractor.process(documents, metadata)
-            tender.semantic_data = semantic_data
-            tender.processing_stage = ProcessingStage.SEMANTIC_PROCESSED
+        # Use parsed documents if available, otherwise empty list
+        documents = tender.parsed_documents if tender.is_documents_parsed else []
 
-            logger.info(f"Extracted semantic data for {tender.tender_id}")
+        # Extract semantic data
+        extractor = self._get_tender_extractor(language=lang)
+        semantic_data = extractor.process(documents, metadata)
+        tender.semantic_data = semantic_data
+        tender.processing_stage = ProcessingStage.SEMANTIC_PROCESSED
 
-        except Exception as e:
-            error_msg = f"Semantic extraction failed for {tender.tender_id}: {e}"
-            logger.error(error_msg)
-            tender.processing_errors.append(error_msg)
-
-        return tender
+        logger.info(f"Extracted semantic data for {tender.tender_id}")
 
-    def _index_in_vector_search(self, tender: UnifiedTenderRecord) -> UnifiedTenderRecord:
+    def _index_in_vector_search(self, tender: UnifiedTenderRecord) -> None:
         """Index tender in vector search (both Czech and English)"""
-        try:
-            logger.info(f"Indexing {tender.tender_id} in vector search")
+        if not tender.semantic_data:
+            logger.info(f"No semantic data for {tender.tender_id}, skipping vector indexing")
+            return
 
-            # Prepare Czech version
-            czech_data = tender.prepare_data_for_vector_database()
-            self.vector_search.add_items("tenders_czech", [czech_data])
+        logger.info(f"Indexing {tender.tender_id} in vector search")
 
-            tender.processing_stage = ProcessingStage.VECTOR_INDEXED
+        # Prepare Czech version
+        czech_data = tender.prepare_data_for_vector_database()
+        self.vector_search.add_items("tenders_czech", [czech_data])
 
-            logger.info(f"Indexed {tender.tender_id} in vector search (both languages)")
-            return tender
+        tender.processing_stage = ProcessingStage.VECTOR_INDEXED
 
-        except Exception as e:
-            error_msg = f"Vector indexing failed for {tender.tender_id}: {e}"
-            logger.error(error_msg)
-            tender.processing_errors.append(error_msg)
+        logger.info(f"Indexed {tender.tender_id} in vector search (both languages)")
+
+    def _index_batch_in_vector_search(self, tenders: List[UnifiedTenderRecord]) -> List[FailedTender]:
+        """
+        Index a batch of tenders in vector search with a single add_items call
+        Returns:
+            FailedTender for every tender of the batch if indexing failed, otherwise an empty list
+        """
+        tenders_to_index = [tender for tender in tenders if tender.semantic_data]
+        if not tenders_to_index:
+            return []
 
-    def _save_to_database(self, tender: UnifiedTenderRecord):
-        """Save tender to database"""
         try:
-            logger.info(f"Saving {tender.tender_id} to database")
+            logger.info(f"Indexing {len(tenders_to_index)} tenders in vector search")
+
+            items = [tender.prepare_data_for_vector_database() for tender in tenders_to_index]
+            self.vector_search.add_items("tenders_czech", items)
 
-            pass  # TODO: finish this
+            for tender in tenders_to_index:
+                tender.processing_stage = ProcessingStage.VECTOR_INDEXED
+
+            logger.info(f"Indexed {len(tenders_to_index)} tenders in vector search")
+            return []
 
         except Exception as e:
-            error_msg = f"Database save failed for {tender.tender_id}: {e}"
-            logger.error(error_msg)
-            tender.processing_errors.append(error_msg)
+            logger.error(f"Batch vector indexing failed: {e}")
+            failed = []
+            for tender in tenders_to_index:
+                tender.add_processing_error(f"Vector indexing failed for {tender.tender_id}: {e}")
+                failed.append(FailedTender(tender=tender, failed_stage=ProcessingStage.VECTOR_INDEXED, error=str(e)))
+            return failed
+
+    def _save_to_database(self, tender: UnifiedTenderRecord) -> None:
+        """Save tender to database"""
+        logger.info(f"Saving {tender.tender_id} to database")
+
+        # TODO: finish this, then run it in _run_stages as ProcessingStage.DATABASE_SAVED
 
     def process_batch(self,
                       source_name: str,
@@ -179,8 +255,14 @@ class TenderProcessingPipeline:
                       batch_size: int = 10,
                       skip_documents: bool = False,
                       skip_llm: bool = False,
-                      skip_vector_search: bool = False) -> List[UnifiedTenderRecord]:
-        """Process multiple tenders in batches"""
+                      skip_vector_search: bool = False,
+                      max_retries: int = 0) -> List[UnifiedTenderRecord]:
+        """
+        Process multiple tenders in batches.
+        Tenders failing a stage are retried up to max_retries times (none by default), resuming from the
+        failed stage. Retries wait RETRY_BACKOFF_SECONDS before the first attempt, doubling the delay on
+        each further one.
+        """
 
         results = []
         total = len(source_data_list)
@@ -189,21 +271,59 @@ class TenderProcessingPipeline:
             batch = source_data_list[i:i + batch_size]
             logger.info(f"Processing batch {i // batch_size + 1}/{(total + batch_size - 1) // batch_size}")
 
-            batch_results = []
+            indexed_later = bool(self.vector_search) and not skip_vector_search
+            processed = []
+            failed = []
             for source_data in batch:
                 try:
-                    result = self.process_from_source(
-                        source_name,
-                        source_data,
+                    tender = SourceMapperRegistry.map_to_unified(source_name, source_data)
+                    failed_tender = self._run_stages(
+                        tender,
                         skip_documents=skip_documents,
                         skip_llm=skip_llm,
-                        skip_vector_search=skip_vector_search
+                        skip_vector_search=True  # indexed once per batch below
                     )
-                    batch_results.append(result)
                 except Exception as e:
                     logger.error(f"Failed to process tender in batch: {e}")
                     continue
 
+                if failed_tender:
+                    failed.append(failed_tender)
+                else:
+                    processed.append(tender)
+
+            if indexed_later:
+                # Tenders whose indexing failed are retried one by one with the other failures
+                index_failures = self._index_batch_in_vector_search(processed)
+                failed_ids = {id(failed_tender.tender) for failed_tender in index_failures}
+                processed = [tender for tender in processed if id(tender) not in failed_ids]
+                failed.extend(index_failures)
+            batch_results = [self._complete(tender) for tender in processed]
+
+            for attempt in range(1, max_retries + 1):
+                if not failed:
+                    break
+                backoff = RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+                logger.info(f"Retrying {len(failed)} failed tenders in {backoff}s (attempt {attempt}/{max_retries})")
+                time.sleep(backoff)
+                still_failed = []
+                for failed_tender in failed:
+                    result = self.resume_processing(
+                        failed_tender.tender,
+                        skip_documents=skip_documents,
+                        skip_llm=skip_llm,
+                        skip_vector_search=skip_vector_search
+                    )
+                    if isinstance(result, FailedTender):
+                        still_failed.append(result)
+                    else:
+                        batch_results.append(result)
+                failed = still_failed
+
+            for failed_tender in failed:
+                logger.error(f"Giving up on {failed_tender.tender.tender_id} at stage "
+                             f"'{failed_tender.failed_stage.value}': {failed_tender.error}")
+
             results.extend(batch_results)
             logger.info(f"Completed batch with {len(batch_results)} successful processings")
 
@@ -3,6 +3,7 @@ from dataclasses import fields, is_dataclass
 from typing import TypeVar, Dict, Any, List, Set, Union
 from typing import get_origin, get_args
 
+import numpy as np
 import tiktoken
 from llm_adapters import model_config
 
@@ -82,22 +83,22 @@ def chunk_text_for_user_prompt(
 
     # Chunk the full_text based on usable token budget
     paragraphs = full_text.split("\n\n")
+    token_counts = [len(tokens) for tokens in tokenizer.encode_batch(paragraphs)]
+    cumulative_tokens = np.cumsum(token_counts)
     chunks = []
-    current_chunk = ""
-    token_count = 0
-
-    for para in paragraphs:
-        para_tokens = count_tokens(para, tokenizer)
-        if token_count + para_tokens > max_available_tokens and current_chunk:
-            chunks.append(current_chunk.strip())
-            current_chunk = para
-            token_count = para_tokens
-        else:
-            current_chunk += "\n\n" + para
-            token_count += para_tokens
-
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+    start = 0
+    offset = 0
+
+    # Greedily pack paragraphs: each chunk ends at the last paragraph whose
+    # running token total still fits into the budget
+    while start < len(paragraphs):
+        end = int(np.searchsorted(cumulative_tokens, offset + max_available_tokens, side="right"))
+        end = max(end, start + 1)  # an oversized paragraph still forms its own chunk
+        chunk = "\n\n".join(paragraphs[start:end]).strip()
+        if chunk:
+            chunks.append(chunk)
+        offset = cumulative_tokens[end - 1]
+        start = end
 
     return chunks
 
@@ -1,7 +1,14 @@
+import glob
+import hashlib
+import importlib.util
 import logging
 import os
+import re
+import shutil
 import tempfile
+import threading
 from typing import Optional
+from urllib.parse import unquote
 
 import requests
 from bs4 import BeautifulSoup
@@ -11,33 +18,91 @@ from src.utils.file_utils import FileType, get_file_type, guess_file_type_from_c
 logger = logging.getLogger(__name__)
 
 REQUEST_TIMEOUT = 10
+# lxml's C parser is several times faster than the pure-Python html.parser; lxml is optional
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+# Matches both filename="..." and RFC 5987 filename*=UTF-8''... forms
+CONTENT_DISPOSITION_FILENAME_RE = re.compile(r"filename\*?=(?:UTF-8''|\"?)([^\";]+)\"?", re.IGNORECASE)
+REQUEST_ERRORS = (
+    requests.exceptions.Timeout,
+    requests.exceptions.HTTPError,
+    requests.exceptions.ConnectionError,
+)
 
 
 class HttpClient:
     """Handles HTTP requests for HTML parsing and file downloads."""
 
-    def __init__(self, user_agent: str = "Mozilla/5.0 (compatible; NenScraperBot/1.0)"):
+    def __init__(self, user_agent: str = "Mozilla/5.0 (compatible; NenScraperBot/1.0)",
+                 cache_dir: Optional[str] = None):
+        """
+        Args:
+            user_agent: User-Agent header sent with every request
+            cache_dir: Directory for the content-addressed download cache, disabled by default.
+                Entries are never evicted, so the caller owns the directory's lifetime
+        """
         self.headers = {"User-Agent": user_agent}
         self.request_count = 0
+        # Downloads run on several threads (DocumentsParser), keep the counter consistent
+        self._request_count_lock = threading.Lock()
+        self.cache_dir = cache_dir
+
+    def _get_cache_path(self, url: str) -> Optional[str]:
+        """Return the cache path prefix for a URL (sharded by the first two hex chars of its SHA-256)."""
+        if not self.cache_dir:
+            return None
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    @staticmethod
+    def _find_cached_file(cache_path: str) -> Optional[str]:
+        """Find a completed cache entry (any suffix, excluding partial downloads)."""
+        for candidate in glob.glob(f"{glob.escape(cache_path)}*"):
+            if not candidate.endswith(".part"):
+                return candidate
+        return None
+
+    @staticmethod
+    def _link_to_temp_file(source_path: str) -> str:
+        """Expose a cached file under a fresh temporary path, hardlinking when possible."""
+        suffix = os.path.splitext(source_path)[-1]
+        fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        os.unlink(tmp_path)
+        try:
+            os.link(source_path, tmp_path)
+        except OSError:
+            # Hardlinks fail across filesystems, fall back to a plain copy
+            shutil.copyfile(source_path, tmp_path)
+        return tmp_path
+
+    @staticmethod
+    def _log_request_error(action: str, url: str, error: Exception) -> None:
+        """Log a failed request, adding the detail relevant to the error type."""
+        details = ""
+        if isinstance(error, requests.exceptions.HTTPError):
+            details = f" (status code: {error.response.status_code})"
+        elif isinstance(error, requests.exceptions.Timeout):
+            details = f" (timeout: {REQUEST_TIMEOUT}s)"
+        logger.error(f"{type(error).__name__} {action} {url}: {error}{details}")
+
+    def _next_request_number(self) -> int:
+        """Count a request and return its number."""
+        with self._request_count_lock:
+            self.request_count += 1
+            return self.request_count
 
     def get_soup(self, url: str) -> Optional[BeautifulSoup]:
         """Fetch HTML from URL and return BeautifulSoup object."""
-        self.request_count += 1
-        logger.info(f"Request #{self.request_count}: Fetching URL: {url}")
+        request_number = self._next_request_number()
+        logger.info(f"Request #{request_number}: Fetching URL: {url}")
 
         try:
             response = requests.get(url, headers=self.headers, timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             logger.debug(f"Successfully fetched URL: {url} (status code: {response.status_code})")
-            return BeautifulSoup(response.text, "html.parser")
-        except requests.exceptions.Timeout:
-            logger.error(f"Timeout error fetching URL {url} (timeout: {REQUEST_TIMEOUT}s)")
-            return None
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error fetching URL {url}: {e} (status code: {e.response.status_code})")
-            return None
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"Connection error fetching URL {url}: {e}")
+            return BeautifulSoup(response.text, HTML_PARSER)
+        except REQUEST_ERRORS as e:
+            self._log_request_error("fetching URL", url, e)
             return None
         except Exception as e:
             logger.error(f"Unexpected error fetching URL {url}: {e}")
@@ -54,8 +119,15 @@ class HttpClient:
         Returns:
             Path to the downloaded file or None if download failed
         """
-        self.request_count += 1
-        logger.info(f"Request #{self.request_count}: Downloading file from URL: {url}")
+        cache_path = self._get_cache_path(url)
+        if cache_path:
+            cached_file = self._find_cached_file(cache_path)
+            if cached_file:
+                logger.info(f"Using cached download for URL: {url}")
+                return self._link_to_temp_file(cached_file)
+
+        request_number = self._next_request_number()
+        logger.info(f"Request #{request_number}: Downloading file from URL: {url}")
         
         try:
             response = requests.get(url, headers=self.headers, timeout=REQUEST_TIMEOUT, stream=True)
@@ -70,12 +142,10 @@ class HttpClient:
                 
             # If no extension from file_name, try content-disposition header
             if not suffix and response.headers.get('content-disposition'):
-                import re
                 cd = response.headers.get('content-disposition')
-                if cd:
-                    filename = re.findall('filename="(.+)"', cd)
-                    if filename:
-                        suffix = os.path.splitext(filename[0])[-1]
+                match = CONTENT_DISPOSITION_FILENAME_RE.search(cd)
+                if match:
+                    suffix = os.path.splitext(unquote(match.group(1)))[-1]
             
             # If still no extension, try content-type
             if not suffix:
@@ -86,27 +156,38 @@ class HttpClient:
                 else:
                     suffix = '.bin'
             
-            # Create temporary file
-            tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-            logger.debug(f"Saving downloaded file to: {tmp_file.name}")
+            if cache_path:
+                # Download into the cache first and publish it atomically once complete; every
+                # writer gets its own partial file, so concurrent downloads of a URL do not collide
+                cache_shard_dir = os.path.dirname(cache_path)
+                os.makedirs(cache_shard_dir, exist_ok=True)
+                fd, file_path = tempfile.mkstemp(
+                    dir=cache_shard_dir, prefix=f"{os.path.basename(cache_path)}.", suffix=".part"
+                )
+            else:
+                fd, file_path = tempfile.mkstemp(suffix=suffix)
+            logger.debug(f"Saving downloaded file to: {file_path}")
             
             # Save the content
-            with open(tmp_file.name, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        if chunk:
+                            f.write(chunk)
+            except Exception:
+                os.unlink(file_path)
+                raise
+
+            if cache_path:
+                cached_file = f"{cache_path}{suffix}"
+                os.replace(file_path, cached_file)
+                file_path = self._link_to_temp_file(cached_file)
             
-            logger.info(f"Successfully downloaded file from {url} to {tmp_file.name}")
-            return tmp_file.name
+            logger.info(f"Successfully downloaded file from {url} to {file_path}")
+            return file_path
             
-        except requests.exceptions.Timeout:
-            logger.error(f"Timeout error downloading file from {url} (timeout: {REQUEST_TIMEOUT}s)")
-            return None
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error downloading file from {url}: {e} (status code: {e.response.status_code})")
-            return None
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"Connection error downloading file from {url}: {e}")
+        except REQUEST_ERRORS as e:
+            self._log_request_error("downloading file from", url, e)
             return None
         except Exception as e:
             logger.error(f"Unexpected error downloading file from {url}: {e}")
@@ -1,14 +1,93 @@
+import json
 import logging
-from typing import List, Dict, Any, Optional
-
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_for_futures
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+import httpx
 import numpy as np
+import torch
+from cachetools import LRUCache
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import Batch, Datatype, Distance, VectorParams, PointStruct, OptimizersConfigDiff
 from qdrant_client.models import Filter, FieldCondition, MatchValue, MatchAny
+from qdrant_client.models import ScalarQuantization, ScalarQuantizationConfig, ScalarType
+from qdrant_client.models import SetPayload, SetPayloadOperation, LookupLocation
 from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_BATCH_SIZE = 256
+BATCH_SIZE_CANDIDATES = (32, 64, 128, 256, 512)
+# Encoder micro-batch size; SentenceTransformer sorts texts by length within each encode call
+ENCODE_BATCH_SIZE = 64
+DEFAULT_BULK_PARALLEL = 8
+DEFAULT_INDEXING_THRESHOLD = 20000
+DEFAULT_CACHE_SIZE = 10_000
+DEFAULT_GRPC_PORT = 6334
+DEFAULT_POOL_SIZE = 100
+DEFAULT_QDRANT_TIMEOUT = 60
+# Clip the top/bottom 1% of values when calibrating the int8 range
+QUANTIZATION_QUANTILE = 0.99
+INDEX_CREATION_WORKERS = 8
+# bulk_add_items switches to the multi-process encoder above this many items
+MULTI_PROCESS_ENCODE_THRESHOLD = 10_000
+
+FILTER_CACHE_SIZE = 1024
+QUERY_CACHE_SIZE = 1024
+
+
+def _freeze_filters(filters: Dict[str, Any]) -> Tuple:
+    """
+    Convert a filter dictionary into a hashable, order-independent key.
+    Values are tagged with their type so e.g. True and 1 do not share a cache entry.
+    Args:
+        filters: Dictionary of field-value pairs for filtering
+    Returns:
+        Sorted tuple of (field, type_tag, value) entries
+    """
+    frozen = []
+    for field, value in filters.items():
+        if isinstance(value, list):
+            frozen.append((field, 'list', tuple((type(v).__name__, v) for v in value)))
+        elif isinstance(value, (str, int, float, bool)):
+            frozen.append((field, type(value).__name__, value))
+    return tuple(sorted(frozen))
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _build_cached_filter(frozen_filters: Tuple) -> Filter:
+    """
+    Build a Qdrant filter from frozen filters (see _freeze_filters); results are shared between queries
+    Args:
+        frozen_filters: Hashable filter representation
+    Returns:
+        Qdrant Filter object
+    """
+    must_conditions = []
+    for field, type_tag, value in frozen_filters:
+        if type_tag == 'list':
+            # Match any value in the list - use MatchAny for arrays
+            must_conditions.append(
+                FieldCondition(
+                    key=field,
+                    match=MatchAny(any=[v for _, v in value])
+                )
+            )
+        else:
+            # Exact string or value match
+            must_conditions.append(
+                FieldCondition(
+                    key=field,
+                    match=MatchValue(value=value)
+                )
+            )
+    return Filter(must=must_conditions)
+
 
 # docker pull qdrant/qdrant
 # docker run -p 6333:6333 -p 6334:6334 -v $(pwd)/qdrant_storage:/qdrant/storage qdrant/qdrant
@@ -18,7 +97,14 @@ class VectorSearch:
     def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
                  qdrant_host: str = "localhost",
                  qdrant_port: int = 6333,
-                 index_definition: Dict[str, Any] = None):
+                 index_definition: Dict[str, Any] = None,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 use_fp16: bool = True,
+                 prefer_grpc: bool = True,
+                 grpc_port: int = DEFAULT_GRPC_PORT,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: int = DEFAULT_QDRANT_TIMEOUT,
+                 warmup: bool = False):
         """
         Initialize the vector search with SentenceTransformer model and Qdrant client
         Args:
@@ -26,17 +112,125 @@ class VectorSearch:
             qdrant_host: Qdrant server host
             qdrant_port: Qdrant server port
             index_definition: Dictionary of index definitions by entity type
+            max_in_flight: Maximum number of concurrent upsert requests in add_items
+            use_fp16: Run the encoder in half precision when a CUDA device is available
+            prefer_grpc: Talk to Qdrant over gRPC, connect() falls back to HTTP if it cannot connect
+            grpc_port: Qdrant gRPC port
+            pool_size: HTTP connection pool size of the Qdrant client
+            timeout: Qdrant request timeout in seconds
+            warmup: Connect and probe every existing collection so the first real query is not cold
         """
         logger.info(f"Initializing VectorSearch with model: {model_name}")
         # Initialize SentenceTransformer model
-        self.model = SentenceTransformer(model_name)
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = SentenceTransformer(model_name, device=device)
+        if use_fp16 and device == "cuda":
+            # Halve weights and activations on the GPU
+            self.model.half()
+            logger.info("Encoder running in FP16 on CUDA")
         self.vector_size = self.model.get_sentence_embedding_dimension()
-        # Initialize Qdrant client
-        self.qdrant = QdrantClient(host=qdrant_host, port=qdrant_port)
+        # Multi-process encoder pool, started on first use by encode_batch_mp
+        self._mp_pool = None
+        # Query embeddings depend only on the model, so one cache serves every collection
+        self._query_cache = LRUCache(maxsize=QUERY_CACHE_SIZE)
+        # Collections confirmed to exist, so writes skip the get_collection round-trip
+        self._known_collections = set()
+        # Initialize Qdrant client; no request is sent until first use, see connect()
+        self.qdrant_host = qdrant_host
+        self.qdrant_port = qdrant_port
+        self.grpc_port = grpc_port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.prefer_grpc = prefer_grpc
+        self.qdrant = self._create_qdrant_client()
+        # Upserts are sent from worker threads so encoding of the next batch is not blocked on the server
+        self.max_in_flight = max_in_flight
+        self._upsert_executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="qdrant-upsert")
         self.index_definitions = index_definition if index_definition else {}
+        self._entity_type_re = self._compile_entity_type_re(self.index_definitions)
         # Track active collection versions
         self.active_versions = {}
+        # Batch size used by add_items when none is passed, see tune_batch_size
+        self.optimal_batch_size = DEFAULT_BATCH_SIZE
         logger.info(f"VectorSearch initialized with vector size: {self.vector_size}")
+        if warmup and self.connect():
+            self.warmup_collections(list(self._known_collections))
+
+    def _create_qdrant_client(self) -> QdrantClient:
+        """
+        Create the Qdrant client from the connection settings given to __init__
+        Returns:
+            Qdrant client
+        """
+        # pool_size caps the HTTP connection pool; gRPC multiplexes all requests over one channel
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        return QdrantClient(host=self.qdrant_host, port=self.qdrant_port, grpc_port=self.grpc_port,
+                            prefer_grpc=self.prefer_grpc, timeout=self.timeout, limits=limits)
+
+    def connect(self) -> bool:
+        """
+        Check that Qdrant is reachable, falling back from gRPC to HTTP if the gRPC channel cannot connect.
+        The listed collections are remembered, so later writes skip their existence check.
+        Returns:
+            True if Qdrant answered, False otherwise
+        """
+        try:
+            collections = self.qdrant.get_collections().collections
+        except Exception as e:
+            if not self.prefer_grpc:
+                logger.error(f"Failed to connect to Qdrant at {self.qdrant_host}:{self.qdrant_port}: {e}")
+                return False
+            logger.warning(f"gRPC connection to Qdrant at {self.qdrant_host}:{self.grpc_port} failed, "
+                           f"falling back to HTTP: {e}")
+            self.prefer_grpc = False
+            self.qdrant = self._create_qdrant_client()
+            return self.connect()
+        self._known_collections.update(collection.name for collection in collections)
+        return True
+
+    def warmup_collections(self, collection_names: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Load collection indexes into memory by issuing one probe query per collection
+        Args:
+            collection_names: Collections to warm up (defaults to all collections on the server)
+        Returns:
+            Dictionary of collection name to probe latency in seconds
+        """
+        if collection_names is None:
+            try:
+                collection_names = [collection.name for collection in self.qdrant.get_collections().collections]
+            except Exception as e:
+                logger.error(f"Failed to list collections for warmup: {e}")
+                return {}
+            self._known_collections.update(collection_names)
+
+        probe_vector = np.zeros(self.vector_size, dtype=np.float32).tolist()
+        timings = {}
+        for collection_name in collection_names:
+            start = time.perf_counter()
+            try:
+                self.qdrant.query_points(collection_name=collection_name, query=probe_vector, limit=1)
+            except Exception as e:
+                logger.warning(f"Failed to warm up collection '{collection_name}': {e}")
+                continue
+            timings[collection_name] = time.perf_counter() - start
+            logger.info(f"Warmed up collection '{collection_name}' in {timings[collection_name] * 1000:.1f} ms")
+        return timings
+
+    @staticmethod
+    def _compile_entity_type_re(index_definitions: Dict[str, Any]) -> Optional[re.Pattern]:
+        """
+        Compile a single regex matching '<entity_type>' or '<entity_type>_<version>'
+        Args:
+            index_definitions: Dictionary of index definitions by entity type
+        Returns:
+            Compiled pattern, or None if there are no entity types
+        """
+        if not index_definitions:
+            return None
+        # Longest names first so e.g. 'tenders_czech' wins over 'tenders'
+        entity_types = sorted(index_definitions, key=len, reverse=True)
+        return re.compile(f"^({'|'.join(map(re.escape, entity_types))})(?:_.*)?$")
 
     def _get_entity_type_from_collection_name(self, collection_name: str) -> Optional[str]:
         """
@@ -46,16 +240,10 @@ class VectorSearch:
         Returns:
             Entity type if recognized, None otherwise
         """
-        # Check if collection name matches any known entity types exactly
-        if collection_name in self.index_definitions:
-            return collection_name
-
-        # Check for versioned collections (entity_type_version format)
-        for entity_type in self.index_definitions.keys():
-            if collection_name.startswith(f"{entity_type}_"):
-                return entity_type
-
-        return None
+        if self._entity_type_re is None:
+            return None
+        match = self._entity_type_re.match(collection_name)
+        return match.group(1) if match else None
 
     def _ensure_collection_exists(self, collection_name: str) -> None:
         """
@@ -63,8 +251,11 @@ class VectorSearch:
         Args:
             collection_name: Name of the collection to ensure exists
         """
+        if collection_name in self._known_collections:
+            return
         try:
             self.qdrant.get_collection(collection_name)
+            self._known_collections.add(collection_name)
         except Exception:
             logger.info(f"Collection '{collection_name}' doesn't exist, creating it")
             self.create_collection(collection_name)
@@ -86,14 +277,21 @@ class VectorSearch:
         )
 
     def create_collection(self, collection_name: str, vector_size: Optional[int] = None,
-                          distance: Distance = Distance.COSINE, force_recreate: bool = False) -> bool:
+                          distance: Distance = Distance.DOT, force_recreate: bool = False,
+                          bulk_mode: bool = False, quantize: bool = True, half_precision: bool = True) -> bool:
         """
         Create a new Qdrant collection with automatic index creation based on entity type
         Args:
             collection_name: Name of the collection to create
             vector_size: Size of vectors (uses model's embedding dimension if not provided)
-            distance: Distance metric to use
+            distance: Distance metric to use. Embeddings are L2-normalized at encode time, so DOT
+                ranks like cosine without the per-candidate norm division. Do not use DOT on a
+                collection holding vectors that were stored unnormalized
             force_recreate: Whether to recreate if collection already exists
+            bulk_mode: Create with HNSW indexing disabled; call finalize_bulk_load after ingest
+            quantize: Keep the original vectors on disk and an int8 scalar-quantized copy in RAM
+            half_precision: Store the original vectors as FP16 instead of FP32, halving their storage.
+                Normalized embeddings lose no meaningful ranking precision at FP16
         Returns:
             True if collection was created or already exists, False otherwise
         """
@@ -103,9 +301,11 @@ class VectorSearch:
                 self.qdrant.get_collection(collection_name)
                 if not force_recreate:
                     logger.info(f"Collection '{collection_name}' already exists")
+                    self._known_collections.add(collection_name)
                     return True
                 else:
                     logger.info(f"Deleting existing collection '{collection_name}' for recreation")
+                    self._known_collections.discard(collection_name)
                     self.qdrant.delete_collection(collection_name)
             except Exception:
                 # Collection doesn't exist, which is fine
@@ -115,24 +315,76 @@ class VectorSearch:
             if vector_size is None:
                 vector_size = self.vector_size
 
+            # Quantized search rescores against the on-disk originals, so queries need no changes
+            quantization_config = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=QUANTIZATION_QUANTILE,
+                    always_ram=True
+                )
+            ) if quantize else None
+
             # Create the collection
             self.qdrant.create_collection(
                 collection_name=collection_name,
-                vectors_config=VectorParams(size=vector_size, distance=distance)
+                vectors_config=VectorParams(
+                    size=vector_size,
+                    distance=distance,
+                    on_disk=quantize,
+                    datatype=Datatype.FLOAT16 if half_precision else Datatype.FLOAT32
+                ),
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=0) if bulk_mode else None,
+                quantization_config=quantization_config
             )
-            logger.info(f"Created collection '{collection_name}' with vector size {vector_size}")
+            logger.info(f"Created collection '{collection_name}' with vector size {vector_size}"
+                        f"{' (indexing disabled for bulk load)' if bulk_mode else ''}")
+            self._known_collections.add(collection_name)
 
             # Check if we have index definitions for this collection and create indexes
             entity_type = self._get_entity_type_from_collection_name(collection_name)
             if entity_type and entity_type in self.index_definitions:
-                pass # TODO fix this
-                # self._create_collection_indexes(collection_name, entity_type)
+                self._create_collection_indexes(collection_name, entity_type)
 
             return True
         except Exception as e:
             logger.error(f"Failed to create collection '{collection_name}': {e}")
             return False
 
+    def _get_indexing_threshold(self, collection_name: str) -> Optional[int]:
+        """
+        Get the current HNSW indexing threshold of a collection
+        Args:
+            collection_name: Name of the collection
+        Returns:
+            Indexing threshold, or None if it could not be read
+        """
+        try:
+            return self.qdrant.get_collection(collection_name).config.optimizer_config.indexing_threshold
+        except Exception as e:
+            logger.error(f"Failed to read indexing threshold of '{collection_name}': {e}")
+            return None
+
+    def finalize_bulk_load(self, collection_name: str,
+                           indexing_threshold: int = DEFAULT_INDEXING_THRESHOLD) -> bool:
+        """
+        Re-enable HNSW indexing after a bulk load
+        Args:
+            collection_name: Name of the collection
+            indexing_threshold: Indexing threshold to restore
+        Returns:
+            True if indexing was re-enabled, False otherwise
+        """
+        try:
+            self.qdrant.update_collection(
+                collection_name=collection_name,
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=indexing_threshold)
+            )
+            logger.info(f"Re-enabled indexing for '{collection_name}' (threshold {indexing_threshold})")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to re-enable indexing for '{collection_name}': {e}")
+            return False
+
     def _create_collection_indexes(self, collection_name: str, entity_type: str) -> None:
         """
         Create payload indexes for a collection based on entity type
@@ -140,13 +392,18 @@ class VectorSearch:
             collection_name: Name of the collection
             entity_type: Type of entity ('tenders' or 'companies')
         """
-        indexes = self.index_definitions[entity_type]
-        for field_name, field_type in indexes.indexes:
-            try:
-                self.create_payload_index(collection_name, field_name, field_type)
-                logger.info(f"Created index on {field_name} ({field_type}) for {collection_name}")
-            except Exception as e:
-                logger.warning(f"Failed to create index on {field_name}: {e}")
+        indexes = self.index_definitions[entity_type].indexes
+        if not indexes:
+            return
+        # Each index is an independent blocking RPC; create_payload_index logs its own failures
+        with ThreadPoolExecutor(max_workers=min(INDEX_CREATION_WORKERS, len(indexes))) as executor:
+            results = list(executor.map(
+                lambda index: self.create_payload_index(collection_name, index[0], index[1]),
+                indexes
+            ))
+        failed = [field_name for (field_name, _), created in zip(indexes, results) if not created]
+        if failed:
+            logger.warning(f"Failed to create {len(failed)} of {len(indexes)} indexes for {collection_name}: {failed}")
 
     def create_collection_with_indexes(self, collection_name: str, entity_type: str,
                                        force_recreate: bool = False) -> bool:
@@ -197,65 +454,222 @@ class VectorSearch:
             Vector representation of the text
         """
         try:
-            vector = self.model.encode(text)
+            vector = self.model.encode(text, normalize_embeddings=True).astype(np.float32, copy=False)
             return vector
         except Exception as e:
             logger.error(f"Failed to encode text: {e}")
             raise
 
-    def encode_batch(self, texts: List[str]) -> List[np.ndarray]:
+    def encode_batch(self, texts: List[str], batch_size: int = ENCODE_BATCH_SIZE) -> np.ndarray:
         """
         Encode multiple texts into vectors
         Args:
             texts: List of texts to encode
+            batch_size: Number of texts per encoder forward pass
         Returns:
-            List of vector representations
+            Contiguous float32 matrix of shape (len(texts), vector_size)
         """
         try:
-            vectors = self.model.encode(texts)
-            return [vector for vector in vectors]
+            return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                     normalize_embeddings=True).astype(np.float32, copy=False)
         except Exception as e:
             logger.error(f"Failed to encode batch: {e}")
             raise
 
+    def encode_batch_mp(self, texts: List[str], batch_size: int = ENCODE_BATCH_SIZE) -> np.ndarray:
+        """
+        Encode a large list of texts with a pool of encoder processes (one per GPU, or several CPU workers).
+        The pool is started on the first call and kept until close()
+        Args:
+            texts: List of texts to encode
+            batch_size: Number of texts per encoder forward pass
+        Returns:
+            Contiguous float32 matrix of shape (len(texts), vector_size)
+        """
+        try:
+            if self._mp_pool is None:
+                self._mp_pool = self.model.start_multi_process_pool()
+                logger.info("Started multi-process encoder pool")
+            vectors = self.model.encode_multi_process(texts, self._mp_pool, batch_size=batch_size,
+                                                     normalize_embeddings=True)
+            return np.ascontiguousarray(vectors, dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Failed to encode batch with multi-process pool: {e}")
+            raise
+
+    def close(self) -> None:
+        """
+        Stop the multi-process encoder pool and the upsert worker threads
+        """
+        if self._mp_pool is not None:
+            self.model.stop_multi_process_pool(self._mp_pool)
+            self._mp_pool = None
+        self._upsert_executor.shutdown(wait=True)
+
+    def tune_batch_size(self, collection_name: str, items: List[Dict[str, Any]],
+                        candidate_sizes: tuple = BATCH_SIZE_CANDIDATES) -> int:
+        """
+        Measure add_items throughput for each candidate batch size and keep the fastest.
+        The sample items are upserted (repeatedly, by ID) into the collection, so pass real
+        items that are going to be ingested anyway. Larger batches cut request overhead but
+        raise peak embedding memory, which matters when encoding on a GPU.
+        Args:
+            collection_name: Name of the collection to ingest the sample into
+            items: Sample of preprocessed items, each with 'id', 'text', and optional 'payload'
+            candidate_sizes: Batch sizes to try
+        Returns:
+            Batch size with the lowest latency per item (also stored as optimal_batch_size)
+        """
+        if not items:
+            return self.optimal_batch_size
+
+        timings = {}
+        for batch_size in candidate_sizes:
+            start = time.perf_counter()
+            self.add_items(collection_name, items, batch_size=batch_size)
+            timings[batch_size] = (time.perf_counter() - start) / len(items)
+            logger.info(f"Batch size {batch_size}: {timings[batch_size] * 1000:.3f} ms per item")
+
+        self.optimal_batch_size = min(timings, key=timings.get)
+        logger.info(f"Using batch size {self.optimal_batch_size} for '{collection_name}'")
+        return self.optimal_batch_size
+
     def add_items(self, collection_name: str, items: List[Dict[str, Any]],
-                  batch_size: int = 100) -> List[str]:
+                  batch_size: Optional[int] = None, wait: bool = True) -> List[str]:
         """
         Add preprocessed items to a collection
         Args:
             collection_name: Name of the collection
             items: List of preprocessed items, each with 'id', 'text', and optional 'payload'
-            batch_size: Number of items to process in each batch
+            batch_size: Number of items to process in each batch (defaults to optimal_batch_size)
+            wait: Wait for Qdrant to apply each batch. With False a batch is acknowledged once it is
+                written to the WAL, so the items may not be searchable yet when this returns
         Returns:
             List of IDs of added items
         """
+        batch_size = batch_size or self.optimal_batch_size
+        # Ensure collection exists
+        self._ensure_collection_exists(collection_name)
+        # IDs are only returned once every batch is stored, so collect them in one pass up front
+        added_ids = [item['id'] for item in items]
+        upserts = deque()
         try:
-            # Ensure collection exists
-            self._ensure_collection_exists(collection_name)
-            added_ids = []
             # Process items in batches
             for i in range(0, len(items), batch_size):
                 batch = items[i:i + batch_size]
-                points = []
+                # Backpressure: with max_in_flight upserts pending, wait for the oldest before
+                # encoding more, so encoded batches never pile up faster than the server accepts them
+                if len(upserts) >= self.max_in_flight:
+                    self._wait_for_upsert(collection_name, *upserts.popleft())
                 # Prepare texts for batch encoding
                 texts = [item['text'] for item in batch]
                 vectors = self.encode_batch(texts)
-                # Create points
-                for item, vector in zip(batch, vectors):
-                    points.append(self._create_point(item, vector))
-                # Upload batch to Qdrant
-                self.qdrant.upsert(
+                batch_ids = added_ids[i:i + batch_size]
+                # Column-oriented batch: one model per request instead of a PointStruct per item,
+                # and the vector matrix is converted to lists in a single call
+                points = Batch(
+                    ids=batch_ids,
+                    vectors=vectors.tolist(),
+                    payloads=[item.get('payload', {}) for item in batch]
+                )
+                # Upload batch to Qdrant concurrently, the next batch is encoded meanwhile
+                upsert = self._upsert_executor.submit(
+                    self.qdrant.upsert,
                     collection_name=collection_name,
-                    points=points
+                    points=points,
+                    wait=wait
                 )
-                batch_ids = [item['id'] for item in batch]
-                added_ids.extend(batch_ids)
-                logger.info(f"Added batch of {len(batch)} items to '{collection_name}'")
-            logger.info(f"Successfully added {len(added_ids)} items to collection '{collection_name}'")
-            return added_ids
+                upserts.append((upsert, batch, vectors))
+                logger.info(f"Queued batch of {len(batch)} items for '{collection_name}'")
+            # Wait for the remaining upserts, re-raising the first failure
+            while upserts:
+                self._wait_for_upsert(collection_name, *upserts.popleft())
+        except Exception:
+            # Drop the batches that have not started and wait for the running ones,
+            # so no upsert is still writing to the collection once this raises
+            pending = [upsert for upsert, _, _ in upserts]
+            for upsert in pending:
+                upsert.cancel()
+            wait_for_futures(pending)
+            raise
+        logger.info(f"Successfully added {len(added_ids)} items to collection '{collection_name}'")
+        return added_ids
+
+    def _on_items_stored(self, collection_name: str, items: List[Dict[str, Any]],
+                         vectors: np.ndarray) -> None:
+        """
+        Hook called with every batch of items once Qdrant confirmed the upsert; subclasses may cache the vectors
+        Args:
+            collection_name: Name of the collection
+            items: Preprocessed items of the batch
+            vectors: Float32 matrix with one row per item
+        """
+
+    def _wait_for_upsert(self, collection_name: str, upsert: Future, items: List[Dict[str, Any]],
+                         vectors: np.ndarray) -> None:
+        """
+        Wait for a queued upsert, log its failure and hand the stored items to _on_items_stored
+        Args:
+            collection_name: Name of the collection
+            upsert: Future returned by the upsert executor
+            items: Preprocessed items of the upserted batch
+            vectors: Float32 matrix with one row per item
+        """
+        try:
+            upsert.result()
         except Exception as e:
             logger.error(f"Failed to add items to collection '{collection_name}': {e}")
             raise
+        self._on_items_stored(collection_name, items, vectors)
+
+    def bulk_add_items(self, collection_name: str, items: List[Dict[str, Any]],
+                       parallel: int = DEFAULT_BULK_PARALLEL,
+                       batch_size: int = DEFAULT_BATCH_SIZE) -> List[str]:
+        """
+        Bulk-load preprocessed items with Qdrant's parallel uploader.
+        HNSW indexing is paused for the duration of the load and restored afterwards,
+        so the index is built once instead of incrementally.
+        Args:
+            collection_name: Name of the collection
+            items: List of preprocessed items, each with 'id', 'text', and optional 'payload'
+            parallel: Number of uploader worker processes
+            batch_size: Number of points per upload request
+        Returns:
+            List of IDs of added items
+        """
+        try:
+            self._ensure_collection_exists(collection_name)
+            ids = [item['id'] for item in items]
+            texts = [item['text'] for item in items]
+            if len(texts) > MULTI_PROCESS_ENCODE_THRESHOLD:
+                vectors = self.encode_batch_mp(texts)
+            else:
+                vectors = self.encode_batch(texts)
+
+            # Restore the collection's own threshold afterwards; one created in bulk mode has
+            # indexing disabled already, so it gets the default
+            indexing_threshold = self._get_indexing_threshold(collection_name) or DEFAULT_INDEXING_THRESHOLD
+            self.qdrant.update_collection(
+                collection_name=collection_name,
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=0)
+            )
+            try:
+                self.qdrant.upload_collection(
+                    collection_name=collection_name,
+                    vectors=vectors,
+                    payload=[item.get('payload', {}) for item in items],
+                    ids=ids,
+                    batch_size=batch_size,
+                    parallel=parallel,
+                    wait=True
+                )
+            finally:
+                self.finalize_bulk_load(collection_name, indexing_threshold)
+            logger.info(f"Bulk loaded {len(ids)} items into collection '{collection_name}'")
+            return ids
+        except Exception as e:
+            logger.error(f"Failed to bulk load items into collection '{collection_name}': {e}")
+            raise
 
     def add_item(self, collection_name: str, item: Dict[str, Any]) -> str:
         """
@@ -288,6 +702,7 @@ class VectorSearch:
                 collection_name=collection_name,
                 points=[point]
             )
+            self._on_items_stored(collection_name, [item], vector[np.newaxis])
             logger.info(f"Upserted item '{item['id']}' to collection '{collection_name}'")
             return item['id']
         except Exception as e:
@@ -306,31 +721,48 @@ class VectorSearch:
         Returns:
             List of search results with id, score, and payload
         """
+        # Encode the query text, reusing the embedding of a repeated query
+        query_key = query_text.strip()
+        query_vector = self._query_cache.get(query_key)
+        if query_vector is None:
+            query_vector = self.encode_text(query_key).tolist()
+            self._query_cache[query_key] = query_vector
+        return self._search(collection_name, query_vector, top_k, filters)
+
+    def _search(self, collection_name: str, query: Any, top_k: int,
+                filters: Optional[Dict[str, Any]], **query_options) -> List[Dict[str, Any]]:
+        """
+        Run a Qdrant query and format the results
+        Args:
+            collection_name: Name of the collection to search
+            query: Query vector, or a point ID to search by that point's stored vector
+            top_k: Number of results to return
+            filters: Optional filters to apply
+            query_options: Additional query_points arguments (e.g. lookup_from)
+        Returns:
+            List of search results with id, score, and payload
+        """
+        # Build filter if provided
+        query_filter = self._build_filter(filters) if filters else None
+        # Perform search using the current API method
         try:
-            # Encode the query text
-            query_vector = self.encode_text(query_text)
-            # Build filter if provided
-            query_filter = self._build_filter(filters) if filters else None
-            # Perform search using the current API method
             search_results = self.qdrant.query_points(
                 collection_name=collection_name,
-                query=query_vector.tolist(),
+                query=query,
                 query_filter=query_filter,
-                limit=top_k
+                limit=top_k,
+                **query_options
             )
-            # Format results
-            results = []
-            for result in search_results.points:
-                results.append({
-                    'id': result.id,
-                    'score': result.score,
-                    'payload': result.payload
-                })
-            logger.info(f"Found {len(results)} results in collection '{collection_name}'")
-            return results
         except Exception as e:
             logger.error(f"Failed to query collection '{collection_name}': {e}")
             raise
+        # Format results
+        results = [
+            {'id': result.id, 'score': result.score, 'payload': result.payload}
+            for result in search_results.points
+        ]
+        logger.info(f"Found {len(results)} results in collection '{collection_name}'")
+        return results
 
     @staticmethod
     def _build_filter(filters: Dict[str, Any]) -> Filter:
@@ -339,39 +771,20 @@ class VectorSearch:
         Args:
             filters: Dictionary of field-value pairs for filtering
         Returns:
-            Qdrant Filter object
+            Qdrant Filter object (cached when the filter values are hashable, do not mutate)
         """
         if not filters:
             return None
-        must_conditions = []
-        for field, value in filters.items():
-            if isinstance(value, list):
-                # Match any value in the list - use MatchAny for arrays
-                must_conditions.append(
-                    FieldCondition(
-                        key=field,
-                        match=MatchAny(any=value)
-                    )
-                )
-            elif isinstance(value, str):
-                # Exact string match
-                must_conditions.append(
-                    FieldCondition(
-                        key=field,
-                        match=MatchValue(value=value)
-                    )
-                )
-            elif isinstance(value, (int, float, bool)):
-                # Exact value match
-                must_conditions.append(
-                    FieldCondition(
-                        key=field,
-                        match=MatchValue(value=value)
-                    )
-                )
-        return Filter(must=must_conditions)
+        frozen_filters = _freeze_filters(filters)
+        try:
+            return _build_cached_filter(frozen_filters)
+        except TypeError:
+            # Nested unhashable values (e.g. a list of dicts) cannot be a cache key, build the filter
+            # uncached so Qdrant's own validation reports them as it did before filters were cached
+            return _build_cached_filter.__wrapped__(frozen_filters)
 
-    def get_collection_name(self, entity_type: str, version: Optional[str] = None) -> str:
+    @staticmethod
+    def get_collection_name(entity_type: str, version: Optional[str] = None) -> str:
         """
         Generate collection name with optional versioning
         Args:
@@ -406,6 +819,35 @@ class VectorSearch:
             logger.error(f"Failed to update payload for point '{point_id}': {e}")
             return False
 
+    def update_payloads(self, collection_name: str, updates: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """
+        Update the payloads of many points in a single request.
+        Points receiving an identical payload are grouped into one set-payload operation
+        Args:
+            collection_name: Name of the collection
+            updates: List of (point_id, payload) pairs
+        Returns:
+            True if all updates were successful, False otherwise
+        """
+        if not updates:
+            return True
+        groups: Dict[str, Tuple[Dict[str, Any], List[str]]] = {}
+        for point_id, payload in updates:
+            key = json.dumps(payload, sort_keys=True, default=str)
+            groups.setdefault(key, (payload, []))[1].append(point_id)
+        operations = [
+            SetPayloadOperation(set_payload=SetPayload(payload=payload, points=point_ids))
+            for payload, point_ids in groups.values()
+        ]
+        try:
+            self.qdrant.batch_update_points(collection_name=collection_name, update_operations=operations)
+        except Exception as e:
+            logger.error(f"Failed to update payloads for {len(updates)} points in '{collection_name}': {e}")
+            return False
+        logger.info(f"Updated payloads for {len(updates)} points ({len(operations)} distinct payloads) "
+                    f"in collection '{collection_name}'")
+        return True
+
 
 class EnhancedVectorSearch(VectorSearch):
     """Enhanced vector search with caching capabilities"""
@@ -413,67 +855,57 @@ class EnhancedVectorSearch(VectorSearch):
     def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
                  qdrant_host: str = "localhost",
                  qdrant_port: int = 6333,
-                 index_definition: Dict[str, Any] = None):
+                 index_definition: Dict[str, Any] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE,
+                 **kwargs):
         """
         Initialize the enhanced vector search
+        Args:
+            cache_size: Maximum number of cached items per collection (least recently used are evicted)
+            kwargs: Additional VectorSearch options (e.g. max_in_flight)
         """
-        super().__init__(model_name, qdrant_host, qdrant_port, index_definition)
-        self.cache = {}
-        logger.info("EnhancedVectorSearch initialized with caching")
+        super().__init__(model_name, qdrant_host, qdrant_port, index_definition, **kwargs)
+        self.cache_size = cache_size
+        self.cache: Dict[str, LRUCache] = {}
+        logger.info(f"EnhancedVectorSearch initialized with caching (max {cache_size} items per collection)")
 
-    def add_item(self, collection_name: str, item: Dict[str, Any]) -> str:
+    def _get_collection_cache(self, collection_name: str) -> LRUCache:
         """
-        Add a single preprocessed item with caching
+        Get the LRU cache of a collection, creating it on first use
         Args:
             collection_name: Name of the collection
-            item: Preprocessed item with 'id', 'text', and optional 'payload'
         Returns:
-            ID of the added item
+            Bounded cache of items by ID
         """
-        # Add to vector database
-        item_id = super().add_item(collection_name, item)
-        # Cache the item
         if collection_name not in self.cache:
-            self.cache[collection_name] = {}
-        self.cache[collection_name][item_id] = item
-        return item_id
+            self.cache[collection_name] = LRUCache(maxsize=self.cache_size)
+        return self.cache[collection_name]
 
-    def add_items(self, collection_name: str, items: List[Dict[str, Any]],
-                  batch_size: int = 100) -> List[str]:
+    @staticmethod
+    def _cache_entry(item: Dict[str, Any], vector: np.ndarray) -> Dict[str, Any]:
         """
-        Add preprocessed items with caching
+        Build the cached form of an item; the search text is dropped as it is the largest
+        field (primary content is repeated), the FP16 vector is kept for similarity queries
         Args:
-            collection_name: Name of the collection
-            items: List of preprocessed items, each with 'id', 'text', and optional 'payload'
-            batch_size: Number of items to process in each batch
+            item: Preprocessed item with 'id', 'text', and optional 'payload'
+            vector: Embedding of the item's text
         Returns:
-            List of IDs of added items
+            Item with 'id', 'payload' and 'vector'
         """
-        # Add to vector database
-        added_ids = super().add_items(collection_name, items, batch_size)
-        # Cache the items
-        if collection_name not in self.cache:
-            self.cache[collection_name] = {}
-        for item in items:
-            self.cache[collection_name][item['id']] = item
-        return added_ids
+        return {'id': item['id'], 'payload': item.get('payload', {}), 'vector': vector.astype(np.float16)}
 
-    def upsert_item(self, collection_name: str, item: Dict[str, Any]) -> str:
+    def _on_items_stored(self, collection_name: str, items: List[Dict[str, Any]],
+                         vectors: np.ndarray) -> None:
         """
-        Upsert (insert or update) a single preprocessed item with caching
+        Cache the stored items
         Args:
             collection_name: Name of the collection
-            item: Preprocessed item with 'id', 'text', and optional 'payload'
-        Returns:
-            ID of the upserted item
+            items: Preprocessed items of the batch
+            vectors: Float32 matrix with one row per item
         """
-        # Upsert to vector database
-        item_id = super().upsert_item(collection_name, item)
-        # Update cache
-        if collection_name not in self.cache:
-            self.cache[collection_name] = {}
-        self.cache[collection_name][item_id] = item
-        return item_id
+        self._get_collection_cache(collection_name).update(
+            (item['id'], self._cache_entry(item, vector)) for item, vector in zip(items, vectors)
+        )
 
     def get_cached_item(self, collection_name: str, item_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -482,10 +914,32 @@ class EnhancedVectorSearch(VectorSearch):
             collection_name: Name of the collection
             item_id: ID of the item
         Returns:
-            Cached item or None if not found
+            Cached item ('id', 'payload' and FP16 'vector') or None if not found
         """
         return self.cache.get(collection_name, {}).get(item_id)
 
+    def query_similar_to_item(self, collection_name: str, source_collection: str, item_id: str,
+                              top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Search a collection with the vector of an item from another collection (e.g. companies for a tender)
+        Args:
+            collection_name: Name of the collection to search
+            source_collection: Collection holding the item
+            item_id: ID of the item whose vector is used as the query
+            top_k: Number of results to return
+            filters: Optional filters to apply
+        Returns:
+            List of search results with id, score, and payload
+        """
+        cached_item = self.get_cached_item(source_collection, item_id)
+        if cached_item is not None:
+            # No re-encoding and no vector round-trip for items added through this instance
+            query_vector = cached_item['vector'].astype(np.float32).tolist()
+            return self._search(collection_name, query_vector, top_k, filters)
+        # Let Qdrant look up the stored vector server-side
+        return self._search(collection_name, item_id, top_k, filters,
+                            lookup_from=LookupLocation(collection=source_collection))
+
     def clear_cache(self, collection_name: Optional[str] = None) -> None:
         """
         Clear cache for a specific collection or all collections
@@ -1,19 +1,19 @@
 import logging
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Tuple
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CollectionIndexes:
     name: str
-    indexes: List[Tuple[str, str]]
+    indexes: Tuple[Tuple[str, str], ...]
 
 
 tender_indexes = CollectionIndexes(
     name='tenders',
-    indexes=[
+    indexes=(
         # Core classifications
         ('cpv_code', 'keyword'),
         ('tender_size', 'keyword'),
@@ -39,12 +39,12 @@ tender_indexes = CollectionIndexes(
         ('status', 'keyword'),
         ('deadline', 'keyword'),
         ('duration_months', 'integer'),
-    ]
+    )
 )
 
 company_indexes = CollectionIndexes(
     name='companies',
-    indexes=[
+    indexes=(
         # Core classifications
         ('cpv_codes', 'keyword'),
         ('size', 'keyword'),
@@ -59,5 +59,5 @@ company_indexes = CollectionIndexes(
         ('expertise_areas', 'keyword'),
         ('specializations', 'keyword'),
         ('certifications', 'keyword'),
-    ]
+    )
 )
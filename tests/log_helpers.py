@@ -0,0 +1,28 @@
+import logging
+import os
+
+from jnd_utils.log import init_logging
+
+
+def quiet_class_logging(test_class):
+    """
+    Keep INFO logs out of a test class's output; TEST_VERBOSE=1 uses init_logging() instead.
+    The root logger gets level WARNING and a NullHandler, and its previous level and
+    handlers are restored once the class has finished.
+    Args:
+        test_class: unittest.TestCase class, called from its setUpClass
+    """
+    root_logger = logging.getLogger()
+    previous_level = root_logger.level
+    previous_handlers = list(root_logger.handlers)
+
+    def restore():
+        root_logger.setLevel(previous_level)
+        root_logger.handlers[:] = previous_handlers
+
+    test_class.addClassCleanup(restore)
+    if os.environ.get('TEST_VERBOSE'):
+        init_logging()
+    else:
+        root_logger.setLevel(logging.WARNING)
+        root_logger.addHandler(logging.NullHandler())
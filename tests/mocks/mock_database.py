@@ -1,20 +1,38 @@
+import atexit
 import json
 import logging
 import os
+import threading
+import uuid
+from contextlib import contextmanager
 
 import pandas as pd
-from database_tools.adapters.postgresql import PostgresqlAdapter
-from database_tools.lightning_uploader import LightningUploader
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from testcontainers.postgres import PostgresContainer
 
-from src.database.database import Base
-from src.database.database import NenContractRaw
+from src.models.database import Base, UnifiedContractRaw
 
 logger = logging.getLogger(__name__)
 
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+TEST_SCHEMA = 'test_schema'
+# Seeded once per run; every TestDatabaseManager gets its own copy of it
+TEMPLATE_DATABASE = 'test_template'
+NON_ORM_SCHEMA = 'recommender'
+# The container is thrown away after the run, so trade crash safety for write speed
+POSTGRES_COMMAND = (
+    "postgres -c fsync=off -c synchronous_commit=off -c full_page_writes=off -c shared_buffers=256MB"
+)
+# 'memory' runs the tests against an in-memory SQLite database instead of the PostgreSQL container;
+# fine for tests that only need the ORM tables, the Postgres-only non-ORM schema is skipped
+TEST_DB_BACKEND = os.environ.get('TEST_DB_BACKEND', 'postgres')
+MEMORY_DATABASE_URL = 'sqlite+pysqlite:///file:{name}?mode=memory&cache=shared&uri=true'
+
 # Add a tuple with the CSV file for testing
 tables_sources = [
-    (NenContractRaw, '')
+    (UnifiedContractRaw, '')
 ]
 
 table_source_not_orm = [
@@ -22,6 +40,56 @@ table_source_not_orm = [
 ]
 
 
+# One container is shared by the whole test run, see get_postgres_container
+_postgres_container = None
+_postgres_container_lock = threading.Lock()
+_admin_engine = None
+_template_lock = threading.Lock()
+_template_ready = False
+
+
+def get_postgres_container():
+    """Start the shared PostgreSQL container on first use and return it."""
+    global _postgres_container
+    with _postgres_container_lock:
+        if _postgres_container is None:
+            logger.info("Starting PostgreSQL container...")
+            container = PostgresContainer("postgres:15").with_command(POSTGRES_COMMAND)
+            container.start()
+            atexit.register(_stop_postgres_container)
+            _postgres_container = container
+            logger.info(f"Container started on port {container.get_exposed_port(5432)}")
+        return _postgres_container
+
+
+def get_admin_engine():
+    """Return the shared autocommit engine on the maintenance database, for CREATE/DROP DATABASE."""
+    global _admin_engine
+    container = get_postgres_container()
+    with _postgres_container_lock:
+        if _admin_engine is None:
+            url = make_url(container.get_connection_url()).set(database='postgres')
+            # Pooled for the whole run, so cloning a database per test does not pay a new connection
+            _admin_engine = create_engine(url, isolation_level='AUTOCOMMIT', pool_size=5,
+                                          max_overflow=10, pool_pre_ping=True)
+        return _admin_engine
+
+
+def _stop_postgres_container():
+    """Stop the shared container at interpreter shutdown."""
+    global _postgres_container, _admin_engine
+    with _postgres_container_lock:
+        if _admin_engine is not None:
+            _admin_engine.dispose()
+            _admin_engine = None
+        if _postgres_container is not None:
+            try:
+                _postgres_container.stop()
+            except Exception as e:
+                logger.warning(f"Container cleanup error: {e}")
+            _postgres_container = None
+
+
 def load_json(file_path):
     with open(file_path, 'r') as file:
         data_json = json.load(file)
@@ -34,39 +102,109 @@ def load_csv(file_path):
     return df.to_dict(orient='records')
 
 
+class MemoryDatabase:
+    """In-memory SQLite stand-in for the parts of PostgresqlAdapter the tests use."""
+
+    def __init__(self, database_name):
+        # A named shared-cache database is visible to every pooled connection and lives
+        # as long as one connection is open, so keep one open until close()
+        self.engine = create_engine(MEMORY_DATABASE_URL.format(name=database_name),
+                                    connect_args={'check_same_thread': False}, poolclass=QueuePool)
+        self._keep_alive = self.engine.raw_connection()
+        self._session_factory = sessionmaker(bind=self.engine)
+
+    def init_schema(self, metadata):
+        metadata.create_all(self.engine)
+
+    def bulk_insert(self, model, data):
+        with self.engine.begin() as conn:
+            conn.execute(model.__table__.insert(), data)
+
+    @contextmanager
+    def session_manager(self):
+        session = self._session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def close(self):
+        self._keep_alive.close()
+        self.engine.dispose()
+
+
 class TestDatabaseManager:
     def __init__(self):
         """Initialize the test database manager."""
         self.postgres_container = None
         self.database = None
+        self.database_name = None
+        self.dsn = None
 
     def create_test_database(self):
         """Create a PostgreSQL test database using Docker."""
         logger.info("Starting test database setup...")
+        worker_id = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+        if TEST_DB_BACKEND == 'memory':
+            # Building the schema in memory is cheaper than cloning a template, no container needed
+            self.database = MemoryDatabase(f'test_run_{worker_id}_{uuid.uuid4().hex[:12]}')
+            self.database.init_schema(Base.metadata)
+            self._load_test_data(self.database)
+            logger.info("In-memory test database setup complete")
+            return self.database
+
+        # Reuse the shared PostgreSQL container, starting it on first use
+        self.postgres_container = get_postgres_container()
+        self._ensure_template()
+
+        # Clone the seeded template, a file-level copy instead of rebuilding schema and fixtures
+        self.database_name = f'test_run_{worker_id}_{uuid.uuid4().hex[:12]}'
+        with get_admin_engine().connect() as conn:
+            conn.execute(text(f'CREATE DATABASE {self.database_name} TEMPLATE {TEMPLATE_DATABASE}'))
+
+        self.database = self._create_adapter(self.database_name)
+        # Connection details stay on the manager; os.environ is process-global and
+        # would be overwritten by any other manager running in parallel
+        self.dsn = make_url(self.postgres_container.get_connection_url()).set(
+            database=self.database_name
+        ).render_as_string(hide_password=False)
 
-        # Start PostgreSQL container
-        logger.info("Starting PostgreSQL container...")
-        self.postgres_container = PostgresContainer("postgres:15")
-        self.postgres_container.start()
-        logger.info(f"Container started on port {self.postgres_container.get_exposed_port(5432)}")
+        logger.info("Test database setup complete")
+        return self.database
 
-        # Set environment variables from container - USE CORRECT VARIABLE NAMES
+    def _ensure_template(self):
+        """Create and seed the template database once per test run."""
+        global _template_ready
+        with _template_lock:
+            if _template_ready:
+                return
+            with get_admin_engine().connect() as conn:
+                conn.execute(text(f'DROP DATABASE IF EXISTS {TEMPLATE_DATABASE}'))
+                conn.execute(text(f'CREATE DATABASE {TEMPLATE_DATABASE}'))
+
+            # Seeded through its own adapter, this manager's database is the clone made afterwards
+            template_database = self._create_adapter(TEMPLATE_DATABASE)
+            try:
+                self._seed(template_database)
+            finally:
+                # A template cannot be copied while it has open connections
+                template_database.close()
+            _template_ready = True
+            logger.info(f"Template database '{TEMPLATE_DATABASE}' seeded")
+
+    def _create_adapter(self, database_name):
+        """Create a database adapter for a database in the shared container."""
         container_host = self.postgres_container.get_container_host_ip()
         container_port = str(self.postgres_container.get_exposed_port(5432))
-        container_db = self.postgres_container.dbname
+        container_db = database_name
         container_user = self.postgres_container.username
         container_password = self.postgres_container.password
 
-        os.environ.update({
-            'DB_HOST': container_host,
-            'DB_PORT': container_port,
-            'DB_NAME': container_db,
-            'DB_USER': container_user,
-            'DB_PASS': container_password,  # ✅ Fixed: Use DB_PASS not DB_PASSWORD
-            'DB_SCHEMA': 'test_schema'
-        })
-
-        # Debug: Print environment variables
         logger.info(f"Database connection details:")
         logger.info(f"  Host: {container_host}")
         logger.info(f"  Port: {container_port}")
@@ -74,37 +212,54 @@ class TestDatabaseManager:
         logger.info(f"  User: {container_user}")
         logger.info(f"  Password: {container_password}")
 
+        # Imported here, the memory backend needs neither the container nor database_tools
+        from database_tools.adapters.postgresql import PostgresqlAdapter
+
         # Create database adapter directly with explicit parameters
         # Don't use from_env_vars() due to global variable caching issue
-        self.database = PostgresqlAdapter(
+        return PostgresqlAdapter(
             host=container_host,
             port=int(container_port),
             database_name=container_db,
             user=container_user,
             password=container_password,
-            schema_name='test_schema'
+            schema_name=TEST_SCHEMA
         )
 
-        # Initialize schema
-        self.database.init_schema(Base.metadata)
+    def reset(self):
+        """Recreate the test schema and reload test data without restarting the container."""
+        self._seed(self.database)
 
-        # Load test data (only if files exist)
-        self._load_test_data()
+    def _seed(self, database):
+        """Create the test schema in a database and load the test data into it."""
+        with database.engine.begin() as conn:
+            conn.execute(text(f'DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE'))
+            conn.execute(text(f'CREATE SCHEMA {TEST_SCHEMA}'))
 
-        logger.info("Test database setup complete")
-        return self.database
+        # Initialize schema
+        database.init_schema(Base.metadata)
+        self._set_tables_unlogged(database)
 
-    def _load_test_data(self):
+        # Load test data (only if files exist)
+        self._load_test_data(database)
+
+    @staticmethod
+    def _set_tables_unlogged(database):
+        """Skip WAL writes for the test tables."""
+        # Referencing tables first, a logged table may not reference an unlogged one
+        with database.engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(text(f'ALTER TABLE {TEST_SCHEMA}.{table.name} SET UNLOGGED'))
+
+    @staticmethod
+    def _load_test_data(database):
         """Load test data into the database."""
         # Skip loading test data if files are empty/don't exist
         for model, file_name in tables_sources:
             if not file_name:  # Skip empty file names
                 continue
 
-            data_path = os.path.join(
-                os.path.dirname(os.path.abspath(__file__)),
-                f'data/{file_name}'
-            )
+            data_path = os.path.join(DATA_DIR, file_name)
 
             if not os.path.exists(data_path):
                 logger.info(f"Test data file not found: {data_path}, skipping")
@@ -118,29 +273,30 @@ class TestDatabaseManager:
             else:
                 raise ValueError(f"Unsupported file type for {file_name}")
 
-            self.database.bulk_insert(model, data)
+            database.bulk_insert(model, data)
 
         # Skip non-ORM tables if they're empty
-        up = LightningUploader(schema='recommender', table='', database=self.database)
         for table, file_name in table_source_not_orm:
             if not table or not file_name:  # Skip empty table/file names
                 continue
 
-            data_path = os.path.join(
-                os.path.dirname(os.path.abspath(__file__)),
-                f'data/{file_name}'
-            )
+            data_path = os.path.join(DATA_DIR, file_name)
 
             if not os.path.exists(data_path):
                 logger.info(f"Test data file not found: {data_path}, skipping")
                 continue
 
+            if database.engine.dialect.name != 'postgresql':
+                logger.warning(f"Non-ORM table {table} needs PostgreSQL, skipping")
+                continue
+
+            from database_tools.lightning_uploader import LightningUploader
+
             data = load_csv(data_path)
-            up.table = table
-            up.upload_data(data)
+            LightningUploader(schema=NON_ORM_SCHEMA, table=table, database=database).upload_data(data)
 
     def cleanup(self):
-        """Stop container and clean up."""
+        """Close the database connection and clean up; the shared container is stopped at exit."""
         errors = []
 
         if self.database:
@@ -148,17 +304,17 @@ class TestDatabaseManager:
                 self.database.close()
             except Exception as e:
                 errors.append(f"Database cleanup error: {e}")
+            self.database = None
 
-        if self.postgres_container:
+        if self.database_name:
             try:
-                self.postgres_container.stop()
+                with get_admin_engine().connect() as conn:
+                    # FORCE (PostgreSQL 13+) terminates connections a test left open instead of failing
+                    conn.execute(text(f'DROP DATABASE IF EXISTS {self.database_name} WITH (FORCE)'))
             except Exception as e:
-                errors.append(f"Container cleanup error: {e}")
-
-        # Clean up environment variables
-        env_vars = ['DB_HOST', 'DB_PORT', 'DB_NAME', 'DB_USER', 'DB_PASS', 'DB_SCHEMA']
-        for key in env_vars:
-            os.environ.pop(key, None)
+                errors.append(f"Database drop error: {e}")
+            self.database_name = None
+            self.dsn = None
 
         if errors:
             logger.warning(f"Cleanup errors occurred: {'; '.join(errors)}")
@@ -1,17 +1,36 @@
 # tests/mocks/mock_http_client.py
 
+import copy
 import logging
 import os
+import re
 import shutil
 import tempfile
+import threading
+from functools import lru_cache
 from typing import Optional
 
 from bs4 import BeautifulSoup
 
 from src.utils.file_utils import get_file_type, get_file_extension
+from src.utils.http_client import HTML_PARSER
 
 logger = logging.getLogger(__name__)
 
+FALLBACK_PAGES = ("listing_page.html", "detail_page.html", "documents_page.html")
+FILE_URL_RE = re.compile(r'https://nen\.nipez\.cz/file\?id=(\d+)$')
+# Page type for URLs not in url_to_file_mapping
+FALLBACK_PAGE_RE = re.compile(r'/detail-zakazky/(?:.*(?P<documents>/zadavaci-dokumentace))?')
+
+
+@lru_cache(maxsize=32)
+def _load_soup(file_path: str, mtime: float) -> BeautifulSoup:
+    """Parse a mock HTML file once per (path, modification time)."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    # Same parser as HttpClient.get_soup, so tests see the trees production code sees
+    return BeautifulSoup(html_content, HTML_PARSER)
+
 
 class MockHttpClient:
     """Mock HTTP client that reads HTML files from a test folder and handles file downloads."""
@@ -19,6 +38,8 @@ class MockHttpClient:
     def __init__(self, test_data_path: str):
         self.test_data_path = test_data_path
         self.request_count = 0
+        # Counted under a lock like HttpClient, DocumentsParser calls download_file from its pool
+        self._request_count_lock = threading.Lock()
         self.url_to_file_mapping = {
             # Main listing URL
             "https://nen.nipez.cz/en/verejne-zakazky/p:vz:stavZP=neukoncena": "listing_page.html",
@@ -27,6 +48,21 @@ class MockHttpClient:
             # Documents URL
             "https://nen.nipez.cz/en/verejne-zakazky/detail-zakazky/N006-25-V00015013/zadavaci-dokumentace": "documents_page.html",
         }
+        # Single prefix regex over the mapping; alternation order keeps the first-match-wins semantics
+        self._url_re = re.compile('|'.join(
+            f'(?P<url{i}>{re.escape(url_pattern)})' for i, url_pattern in enumerate(self.url_to_file_mapping)
+        ))
+        self._url_files = {f'url{i}': file_name for i, file_name in enumerate(self.url_to_file_mapping.values())}
+        # Parse every mock page up front, get_soup then only copies a ready tree
+        self._preparsed = {}
+        for file_name in {*self.url_to_file_mapping.values(), *FALLBACK_PAGES}:
+            file_path = os.path.join(test_data_path, file_name)
+            if not os.path.exists(file_path):
+                continue
+            try:
+                self._preparsed[file_name] = _load_soup(file_path, os.path.getmtime(file_path))
+            except Exception as e:
+                logger.error(f"Error parsing mock HTML file {file_path}: {e}")
         # Mapping for file downloads by file ID
         self.file_id_mappings = {
             # Example: Map a file ID to a file in the test data directory
@@ -37,40 +73,41 @@ class MockHttpClient:
         }
         logger.info(f"Initialized MockHttpClient with test data path: {test_data_path}")
 
+    def _next_request_number(self) -> int:
+        """Count a request and return its number."""
+        with self._request_count_lock:
+            self.request_count += 1
+            return self.request_count
+
     def get_soup(self, url: str) -> Optional[BeautifulSoup]:
         """Load HTML from a test file based on URL mapping."""
-        self.request_count += 1
-        logger.info(f"Mock Request #{self.request_count}: URL: {url}")
+        request_number = self._next_request_number()
+        logger.info(f"Mock Request #{request_number}: URL: {url}")
 
         # Find the right test file for this URL
-        file_name = None
-        for url_pattern, mapped_file in self.url_to_file_mapping.items():
-            if url.startswith(url_pattern):
-                file_name = mapped_file
-                break
-
-        if not file_name:
+        match = self._url_re.match(url)
+        if match:
+            file_name = self._url_files[match.lastgroup]
+        else:
             # If no exact match, try to determine the type of page
-            if "/detail-zakazky/" in url and "/zadavaci-dokumentace" in url:
+            page = FALLBACK_PAGE_RE.search(url)
+            if page and page.group('documents'):
                 file_name = "documents_page.html"
-            elif "/detail-zakazky/" in url:
+            elif page:
                 file_name = "detail_page.html"
             else:
                 file_name = "listing_page.html"
 
-        file_path = os.path.join(self.test_data_path, file_name)
-
-        if not os.path.exists(file_path):
-            logger.warning(f"Mock file not found: {file_path}")
+        soup = self._preparsed.get(file_name)
+        if soup is None:
+            logger.warning(f"Mock file not found: {os.path.join(self.test_data_path, file_name)}")
             return None
 
-        logger.debug(f"Loading mock HTML from file: {file_path}")
+        logger.debug(f"Loading mock HTML for file: {file_name}")
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-
-            return BeautifulSoup(html_content, "html.parser")
+            # Callers may modify the tree, so hand out a copy of the preparsed one
+            return copy.copy(soup)
 
         except Exception as e:
             logger.error(f"Error loading mock HTML for URL {url}: {e}")
@@ -78,7 +115,8 @@ class MockHttpClient:
 
     def download_file(self, url: str, file_name: str = None) -> Optional[str]:
         """
-        Mock file download by copying a file from the test data directory.
+        Mock file download by hardlinking a file from the test data directory to a temporary path.
+        No file content is read or copied unless hardlinking fails.
         
         Args:
             url: The URL to "download" from
@@ -87,13 +125,12 @@ class MockHttpClient:
         Returns:
             Path to the "downloaded" file or None if the mock file couldn't be found
         """
-        self.request_count += 1
-        logger.info(f"Mock Request #{self.request_count}: Downloading file from URL: {url}")
+        request_number = self._next_request_number()
+        logger.info(f"Mock Request #{request_number}: Downloading file from URL: {url}")
         
         # Extract file ID from URL if it's a file download URL
-        file_id = None
-        if url.startswith("https://nen.nipez.cz/file?id="):
-            file_id = url.split("=")[-1]
+        file_url = FILE_URL_RE.match(url)
+        file_id = file_url.group(1) if file_url else None
         
         source_file = None
         if file_id and file_id in self.file_id_mappings:
@@ -112,15 +149,19 @@ class MockHttpClient:
             logger.warning(f"Mock file not found: {source_path}")
             return None
             
-        # Create a temporary copy of the file
+        # Expose the file under a temporary path; callers may delete it, so never hand out source_path
         file_ext = os.path.splitext(source_file)[-1]
-        dest_file = tempfile.NamedTemporaryFile(delete=False, suffix=file_ext)
-        dest_path = dest_file.name
-        dest_file.close()
+        fd, dest_path = tempfile.mkstemp(suffix=file_ext)
+        os.close(fd)
         
         try:
-            shutil.copy2(source_path, dest_path)
-            logger.info(f"Successfully copied mock file from {source_path} to {dest_path}")
+            os.unlink(dest_path)
+            try:
+                os.link(source_path, dest_path)
+            except OSError:
+                # Hardlinks fail across filesystems, fall back to a copy; metadata is irrelevant here
+                shutil.copyfile(source_path, dest_path)
+            logger.info(f"Successfully linked mock file from {source_path} to {dest_path}")
             return dest_path
         except Exception as e:
             logger.error(f"Error copying mock file: {e}")
@@ -1,168 +1,99 @@
+import threading
+import time
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, ANY
 import numpy as np
+from pydantic import ValidationError
+from qdrant_client import QdrantClient
 
-from src.vector_search.base import EnhancedVectorSearch
-from src.vector_search.preprocessors.tender import prepare_tender_for_vector_search
-from tests.data.processed_tender_test_example import contract_metadata, tender_detail
+from src.models.unified_tender import UnifiedTenderRecord
+from src.vector_search.base import DEFAULT_INDEXING_THRESHOLD, EnhancedVectorSearch
+
+# Shared embedding returned by the fake model, allocated once for the whole module
+_VEC = np.full(384, 0.1, dtype=np.float32)
+# Shared by every test, so code under test must not be able to modify it in place
+_VEC.setflags(write=False)
+
+
+class _FakeModel:
+    """Lightweight SentenceTransformer stand-in, much cheaper than a MagicMock"""
+
+    def get_sentence_embedding_dimension(self):
+        return 384
+
+    def encode(self, x, **kwargs):
+        return _VEC if isinstance(x, str) else np.broadcast_to(_VEC, (len(x), 384))
 
 
 class TestTenderPreprocessing(unittest.TestCase):
     """Test suite for tender preprocessing functionality"""
-    
-    def test_prepare_tender_for_vector_search(self):
-        """Test the tender preprocessing function with test data"""
-        # Use the test data from processed_tender_test_example.py
-        result = prepare_tender_for_vector_search(contract_metadata, tender_detail)
-        
+
+    @classmethod
+    def setUpClass(cls):
+        """Preprocess the test tender once, the preprocessing is deterministic"""
+        cls.tender = UnifiedTenderRecord(
+            tender_id='NEN_N006/25/V00015462',
+            source_system='NEN',
+            source_tender_id='N006/25/V00015462',
+            raw_scraped_data={},
+            title='Modul Cisco - OB7125-044',
+            description='2x modul Cisco C3850-NM-2-10G',
+            contracting_authority='Ministerstvo zahraničních věcí',
+            cpv_code='32423000-4',
+            cpv_description='Síťové rozbočovače',
+            location='Hlavní město Praha',
+            detail_url='https://nen.nipez.cz/en/verejne-zakazky/detail-zakazky/N006-25-V00015462',
+        )
+        cls.result = cls.tender.prepare_data_for_vector_database()
+
+    def test_prepare_data_for_vector_database(self):
+        """Test the tender preprocessing with test data"""
+        result = self.result
+
         # Verify the structure of the result
-        self.assertIn('id', result)
-        self.assertIn('text', result)
-        self.assertIn('payload', result)
-        
-        # Check that the ID is extracted correctly
-        self.assertEqual(result['id'], 'N006/25/V00015462')
-        
+        self.assertEqual(set(result), {'id', 'text', 'payload'})
+        self.assertEqual(result['id'], str(self.tender.id))
+
         # Verify that the text contains key information
         self.assertIn('Cisco C3850-NM-2-10G', result['text'])
         self.assertIn('Ministerstvo zahraničních věcí', result['text'])
         self.assertIn('Síťové rozbočovače', result['text'])
-        
-        # Check payload structure and key fields
+
+        # Check payload key fields
         payload = result['payload']
-        self.assertEqual(payload['nen_system_number'], 'N006/25/V00015462')
-        self.assertEqual(payload['procurement_name'], 'Modul Cisco - OB7125-044')
+        self.assertEqual(payload['tender_id'], 'NEN_N006/25/V00015462')
+        self.assertEqual(payload['title'], 'Modul Cisco - OB7125-044')
         self.assertEqual(payload['cpv_code'], '32423000-4')
-        self.assertEqual(payload['location_scope'], 'Hlavní město Praha')
-        self.assertEqual(payload['contracting_authority'], 'Ministerstvo zahraničních věcí')
-        self.assertEqual(payload['tender_size'], 'XS')
-        self.assertEqual(payload['complexity'], 'very_low')
-        self.assertFalse(payload['requires_physical_presence'])
-        self.assertListEqual(payload['languages_required'], ['Czech'])
-
-    def test_tender_text_content_structure(self):
-        """Test that the preprocessed text contains all expected Czech labels and content"""
-        result = prepare_tender_for_vector_search(contract_metadata, tender_detail)
-        text = result['text']
-        
-        # Check that Czech labels from the preprocessor are included in the text
-        self.assertIn('Název:', text)  # From procurement_procedure_name
-        self.assertIn('Popis:', text)  # From subject_matter_description
-        self.assertIn('Technická specifikace:', text)  # From technical_spec_summary
-        self.assertIn('Dodávky:', text)  # From deliverables
-        self.assertIn('Harmonogram:', text)  # From timeline
-        self.assertIn('Rozpočet:', text)  # From budget_breakdown
-        self.assertIn('Lokalita:', text)  # From location_scope
-        self.assertIn('Zadavatel:', text)  # From contracting_authority
-        self.assertIn('CPV popis:', text)  # From cpv_description
-        
-        # Verify specific content appears multiple times (due to weighting)
-        cisco_count = text.count('Cisco C3850-NM-2-10G')
-        self.assertGreaterEqual(cisco_count, 2, "Primary content should appear multiple times due to weighting")
-        
-        # Verify specific content
-        self.assertIn('2x modul Cisco C3850-NM-2-10G', text)
-        self.assertIn('Hlavní město Praha', text)
-        self.assertIn('32423000-4', text)
+        self.assertEqual(payload['location'], 'Hlavní město Praha')
+        # Unset fields are left out of the payload
+        self.assertNotIn('deadline', payload)
 
     def test_tender_text_weighting_structure(self):
         """Test that the text weighting works correctly (primary content repeated 3x, secondary 2x, tertiary 1x)"""
-        result = prepare_tender_for_vector_search(contract_metadata, tender_detail)
-        text = result['text']
-        
-        # Primary fields should appear 3 times
-        short_summary_count = text.count(tender_detail.short_summary)
-        self.assertEqual(short_summary_count, 3, "Primary fields should appear 3 times")
-        
-        # Secondary fields should appear 2 times  
-        timeline_count = text.count(f"Harmonogram: {tender_detail.timeline}")
-        self.assertEqual(timeline_count, 2, "Secondary fields should appear 2 times")
-        
-        # Tertiary fields should appear 1 time
-        authority_count = text.count(f"Zadavatel: {contract_metadata.contracting_authority}")
-        self.assertEqual(authority_count, 1, "Tertiary fields should appear 1 time")
+        text = self.result['text']
 
-    def test_tender_payload_completeness(self):
-        """Test that all expected payload fields are present and correctly mapped"""
-        result = prepare_tender_for_vector_search(contract_metadata, tender_detail)
-        payload = result['payload']
-        
-        # Test all the key payload fields from the actual preprocessor
-        expected_fields = [
-            'nen_system_number', 'procurement_name', 'contracting_authority',
-            'cpv_code', 'cpv_description', 'location_scope', 'location_code',
-            'languages_required', 'requires_physical_presence', 'tender_size', 
-            'complexity', 'experience_required', 'deadline', 'timeline',
-            'duration_months', 'key_dates', 'regime', 'procedure_type', 'status',
-            'required_tools_or_stack', 'preferred_technology', 'required_certifications',
-            'collaboration_type', 'formality_level', 'certification_level', 
-            'tender_profile', 'subcontracting_possible', 'is_framework',
-            'renewal_possible', 'knowledge_transfer', 'innovation_expected',
-            'short_summary', 'technical_spec_summary', 'deliverables',
-            'detail_url', 'original_tender_id'
-        ]
-        
-        for field in expected_fields:
-            self.assertIn(field, payload, f"Field '{field}' missing from payload")
-        
-        # Test specific values
-        self.assertEqual(payload['regime'], 'Small-scale public contract')
-        self.assertEqual(payload['procedure_type'], 'Otevřená výzva')
-        self.assertEqual(payload['experience_required'], 'beginner')
-        self.assertEqual(payload['collaboration_type'], 'individual')
-        self.assertEqual(payload['formality_level'], 'minimal')
-        self.assertEqual(payload['certification_level'], 'none')
-        self.assertEqual(payload['tender_profile'], 'supply')
-        self.assertEqual(payload['original_tender_id'], 'N006/25/V00015462')
-
-    def test_tender_date_parsing(self):
-        """Test that date parsing works correctly"""
-        result = prepare_tender_for_vector_search(contract_metadata, tender_detail)
-        payload = result['payload']
-        
-        # Check that deadline is parsed correctly
-        deadline = payload['deadline']
-        self.assertIsNotNone(deadline)
-        # Should contain the original date string since it's a specific format
-        self.assertIn('05/26/2025, 09:00 AM', deadline)
-
-    def test_tender_arrays_and_objects(self):
-        """Test that arrays and complex objects are handled correctly"""
-        result = prepare_tender_for_vector_search(contract_metadata, tender_detail)
-        payload = result['payload']
-        
-        # Test arrays
-        self.assertIsInstance(payload['languages_required'], list)
-        self.assertIsInstance(payload['required_tools_or_stack'], list)
-        self.assertIsInstance(payload['preferred_technology'], list)
-        self.assertIsInstance(payload['required_certifications'], list)
-        self.assertIsInstance(payload['key_dates'], list)
-        
-        # Test boolean fields
-        self.assertIsInstance(payload['requires_physical_presence'], bool)
-        self.assertIsInstance(payload['subcontracting_possible'], bool)
-        self.assertIsInstance(payload['is_framework'], bool)
-        self.assertIsInstance(payload['renewal_possible'], bool)
-        self.assertIsInstance(payload['knowledge_transfer'], bool)
-        self.assertIsInstance(payload['innovation_expected'], bool)
-
-    def test_tender_location_extraction(self):
-        """Test that location information is extracted correctly"""
-        result = prepare_tender_for_vector_search(contract_metadata, tender_detail)
-        payload = result['payload']
-        
-        # Check location fields
-        self.assertEqual(payload['location_scope'], 'Hlavní město Praha')
-        self.assertEqual(payload['location_code'], 'CZ010')
+        expected_counts = {
+            f"Title: {self.tender.title}": 3,
+            f"Description: {self.tender.description}": 2,
+            f"Contracting authority: {self.tender.contracting_authority}": 1,
+        }
+        counts = {needle: text.count(needle) for needle in expected_counts}
+        self.assertEqual(counts, expected_counts, "Fields should be repeated according to their weight")
 
-    def test_tender_cpv_extraction(self):
-        """Test that CPV code information is extracted correctly"""
-        result = prepare_tender_for_vector_search(contract_metadata, tender_detail)
-        payload = result['payload']
-        
-        # Check CPV fields - should prefer semantic over contract data
-        self.assertEqual(payload['cpv_code'], '32423000-4')
-        self.assertEqual(payload['cpv_description'], 'Síťové rozbočovače')
+    def test_tender_payload_types(self):
+        """Test that payload values have the types Qdrant filters expect"""
+        payload = self.result['payload']
+
+        expected_types = {
+            'tender_id': str,
+            'source_system': str,
+            'cpv_code': str,
+            'is_framework': bool,
+            'has_lots': bool,
+        }
+        for field_name, expected_type in expected_types.items():
+            with self.subTest(field=field_name):
+                self.assertIsInstance(payload[field_name], expected_type)
 
 
 class TestEnhancedVectorSearch(unittest.TestCase):
@@ -173,14 +104,17 @@ class TestEnhancedVectorSearch(unittest.TestCase):
         self.qdrant_host = "localhost"
         self.qdrant_port = 6333
 
-    @patch("src.vector_search.base.SentenceTransformer")
-    @patch("src.vector_search.base.QdrantClient")
-    def test_init(self, mock_qdrant_client, mock_sentence_transformer):
-        """Test initialization of EnhancedVectorSearch"""
-        mock_model = MagicMock()
-        mock_model.get_sentence_embedding_dimension.return_value = 384
-        mock_sentence_transformer.return_value = mock_model
+        # Shared patching for every test; tests that inspect encoder calls swap in their own model
+        sentence_transformer_patcher = patch("src.vector_search.base.SentenceTransformer", return_value=_FakeModel())
+        qdrant_client_patcher = patch("src.vector_search.base.QdrantClient")
+        self.mock_sentence_transformer = sentence_transformer_patcher.start()
+        self.mock_qdrant_client = qdrant_client_patcher.start()
+        self.addCleanup(sentence_transformer_patcher.stop)
+        self.addCleanup(qdrant_client_patcher.stop)
+        self.mock_qdrant = self.mock_qdrant_client.return_value
 
+    def test_init(self):
+        """Test initialization of EnhancedVectorSearch"""
         enhanced_search = EnhancedVectorSearch(
             model_name=self.model_name,
             qdrant_host=self.qdrant_host,
@@ -188,298 +122,213 @@ class TestEnhancedVectorSearch(unittest.TestCase):
         )
 
         # Check base class initialization
-        mock_sentence_transformer.assert_called_once_with(self.model_name)
-        mock_qdrant_client.assert_called_once_with(host=self.qdrant_host, port=self.qdrant_port)
+        self.mock_sentence_transformer.assert_called_once_with(self.model_name, device=ANY)
+        self.mock_qdrant_client.assert_called_once_with(
+            host=self.qdrant_host, port=self.qdrant_port, grpc_port=6334, prefer_grpc=True,
+            timeout=60, limits=ANY
+        )
+        # Nothing is sent to Qdrant until connect() or the first request
+        self.mock_qdrant.get_collections.assert_not_called()
         self.assertEqual(enhanced_search.vector_size, 384)
         
         # Check enhanced features
-        self.assertIn('tenders', enhanced_search.preprocessors)
-        self.assertIn('companies', enhanced_search.preprocessors)
         self.assertEqual(enhanced_search.cache, {})
 
-    @patch("src.vector_search.base.SentenceTransformer")
-    @patch("src.vector_search.base.QdrantClient")
-    def test_preprocess_and_add_tender(self, mock_qdrant_client, mock_sentence_transformer):
-        """Test preprocessing and adding a tender using the high-level method"""
-        # Mock the sentence transformer
-        mock_model = MagicMock()
-        mock_model.get_sentence_embedding_dimension.return_value = 384
-        mock_model.encode.return_value = np.array([0.1] * 384)
-        mock_sentence_transformer.return_value = mock_model
-        
-        # Mock the Qdrant client
-        mock_qdrant = MagicMock()
-        mock_qdrant_client.return_value = mock_qdrant
-        
-        # Create EnhancedVectorSearch instance
-        enhanced_search = EnhancedVectorSearch(
-            model_name=self.model_name,
-            qdrant_host=self.qdrant_host,
-            qdrant_port=self.qdrant_port,
-        )
-        
-        # Mock collection creation (auto-creation in add_items)
-        mock_qdrant.get_collection.side_effect = Exception("Collection not found")
-        mock_qdrant.create_collection.return_value = MagicMock()
-        mock_qdrant.upsert.return_value = MagicMock()
-        
-        # Test preprocessing and adding tender
-        tender_id = enhanced_search.preprocess_and_add_tender(contract_metadata, tender_detail)
-        
-        # Verify the tender was processed and added
-        self.assertEqual(tender_id, 'N006/25/V00015462')
-        
-        # Verify collection operations
-        collection_name = enhanced_search.get_collection_name('tenders')
-        mock_qdrant.get_collection.assert_called()
-        mock_qdrant.create_collection.assert_called()
-        mock_qdrant.upsert.assert_called()
-        
-        # Verify caching
-        self.assertIn(collection_name, enhanced_search.cache)
-        self.assertIn(tender_id, enhanced_search.cache[collection_name])
-        
-        # Check cached data structure
-        cached_tender = enhanced_search.cache[collection_name][tender_id]
-        self.assertEqual(cached_tender['id'], tender_id)
-        self.assertIn('text', cached_tender)
-        self.assertIn('payload', cached_tender)
-        
-        # Verify payload content matches preprocessing
-        payload = cached_tender['payload']
-        self.assertEqual(payload['nen_system_number'], 'N006/25/V00015462')
-        self.assertEqual(payload['procurement_name'], 'Modul Cisco - OB7125-044')
-        self.assertEqual(payload['cpv_code'], '32423000-4')
-        self.assertEqual(payload['contracting_authority'], 'Ministerstvo zahraničních věcí')
-
-    @patch("src.vector_search.base.SentenceTransformer")
-    @patch("src.vector_search.base.QdrantClient")
-    def test_add_multiple_tenders(self, mock_qdrant_client, mock_sentence_transformer):
-        """Test adding multiple tenders in batch"""
-        # Mock the sentence transformer
-        mock_model = MagicMock()
-        mock_model.get_sentence_embedding_dimension.return_value = 384
-        mock_model.encode.return_value = np.array([0.1] * 384)
-        mock_sentence_transformer.return_value = mock_model
-        
-        # Mock the Qdrant client
-        mock_qdrant = MagicMock()
-        mock_qdrant_client.return_value = mock_qdrant
-        
-        # Create EnhancedVectorSearch instance
-        enhanced_search = EnhancedVectorSearch()
-        
-        # Mock collection operations
-        mock_qdrant.get_collection.side_effect = Exception("Collection not found")
-        mock_qdrant.create_collection.return_value = MagicMock()
-        mock_qdrant.upsert.return_value = MagicMock()
-        
-        # Prepare multiple tender data
-        tenders_data = [
-            {'contract': contract_metadata, 'semantic': tender_detail},
-            # Could add more test data here for more comprehensive testing
+    def test_init_builds_real_client(self):
+        """Test that the connection settings are accepted by the installed qdrant-client"""
+        self.mock_qdrant_client.side_effect = QdrantClient
+        # Nothing listens on port 1, the client must still be created without a server
+        enhanced_search = EnhancedVectorSearch(qdrant_port=1, grpc_port=2, pool_size=10, timeout=1)
+
+        self.assertIsInstance(enhanced_search.qdrant, QdrantClient)
+        enhanced_search.qdrant.close()
+
+    def test_connect_falls_back_to_http(self):
+        """Test that connect() recreates the client over HTTP when gRPC cannot connect"""
+        collection = MagicMock()
+        collection.name = "tenders"
+        self.mock_qdrant.get_collections.side_effect = [
+            ConnectionError("gRPC unavailable"),
+            MagicMock(collections=[collection]),
         ]
-        
-        # Test batch addition
-        tender_ids = enhanced_search.add_multiple_tenders(tenders_data, batch_size=50)
-        
-        # Verify results
-        self.assertEqual(len(tender_ids), 1)
-        self.assertEqual(tender_ids[0], 'N006/25/V00015462')
-        
-        # Verify batch operations occurred
-        mock_qdrant.upsert.assert_called()
-        
-        # Verify caching for batch operations
-        collection_name = enhanced_search.get_collection_name('tenders')
-        self.assertIn(collection_name, enhanced_search.cache)
-        self.assertIn(tender_ids[0], enhanced_search.cache[collection_name])
-
-    @patch("src.vector_search.base.SentenceTransformer")
-    @patch("src.vector_search.base.QdrantClient")
-    def test_find_matching_companies_for_tender(self, mock_qdrant_client, mock_sentence_transformer):
-        """Test finding companies that match a tender"""
-        # Mock the sentence transformer
-        mock_model = MagicMock()
-        mock_model.get_sentence_embedding_dimension.return_value = 384
-        query_vector = np.array([0.2] * 384)
-        mock_model.encode.return_value = query_vector
-        mock_sentence_transformer.return_value = mock_model
-        
-        # Mock the Qdrant client
-        mock_qdrant = MagicMock()
-        mock_qdrant_client.return_value = mock_qdrant
-        
-        # Create EnhancedVectorSearch instance
         enhanced_search = EnhancedVectorSearch()
-        
-        # Mock search results
-        mock_search_result = MagicMock()
-        mock_search_result.id = 'company_123'
-        mock_search_result.score = 0.85
-        mock_search_result.payload = {
-            'company_name': 'TechCorp Ltd',
-            'technologies': ['Cisco', 'networking'],
-            'languages': ['Czech', 'English']
-        }
-        
-        mock_qdrant.search.return_value = [mock_search_result]
-        
-        # Test finding matching companies for ad-hoc tender (without filters to avoid the MatchValue error)
-        results = enhanced_search.find_matching_companies_for_tender(
-            tender_contract=contract_metadata,
-            tender_semantic=tender_detail,
-            top_k=5,
-            filters=None  # Remove filters to avoid MatchValue error
-        )
-        
-        # Verify search was called
-        mock_qdrant.search.assert_called_once()
-        search_args = mock_qdrant.search.call_args
-        
-        # Check search parameters
-        companies_collection = enhanced_search.get_collection_name('companies')
-        self.assertEqual(search_args[1]['collection_name'], companies_collection)
-        self.assertEqual(search_args[1]['limit'], 5)
-        
-        # Verify results
-        self.assertEqual(len(results), 1)
-        result = results[0]
-        self.assertEqual(result['id'], 'company_123')
-        self.assertEqual(result['score'], 0.85)
-        self.assertEqual(result['payload']['company_name'], 'TechCorp Ltd')
-
-    @patch("src.vector_search.base.SentenceTransformer")
-    @patch("src.vector_search.base.QdrantClient")
-    def test_cached_tender_retrieval(self, mock_qdrant_client, mock_sentence_transformer):
-        """Test that cached tenders are used for search operations"""
-        # Mock the sentence transformer
-        mock_model = MagicMock()
-        mock_model.get_sentence_embedding_dimension.return_value = 384
-        mock_model.encode.return_value = np.array([0.1] * 384)
-        mock_sentence_transformer.return_value = mock_model
-        
-        # Mock the Qdrant client
-        mock_qdrant = MagicMock()
-        mock_qdrant_client.return_value = mock_qdrant
-        
-        # Create EnhancedVectorSearch instance
-        enhanced_search = EnhancedVectorSearch()
-        
-        # Mock collection operations for adding
-        mock_qdrant.get_collection.side_effect = Exception("Collection not found")
-        mock_qdrant.create_collection.return_value = MagicMock()
-        mock_qdrant.upsert.return_value = MagicMock()
-        
-        # Add a tender first
-        tender_id = enhanced_search.preprocess_and_add_tender(contract_metadata, tender_detail)
-        
-        # Now mock for search operations - use search instead of query_points
-        mock_qdrant.search.return_value = []
-        
-        # Test that cached data is used when searching with tender_id (without filters)
-        try:
-            results = enhanced_search.find_matching_companies_for_tender(
-                tender_id=tender_id,
-                top_k=5,
-                filters=None  # Remove filters to avoid issues
-            )
-            # If we get here, the cache worked (no ValueError was raised)
-            search_called = True
-        except ValueError as e:
-            # This would happen if cache wasn't working and tender wasn't found in Qdrant
-            search_called = False
-        
-        # Verify that the search proceeded (meaning cache was used)
-        self.assertTrue(search_called, "Cache should have been used for tender retrieval")
-        mock_qdrant.search.assert_called()
 
-    @patch("src.vector_search.base.SentenceTransformer")
-    @patch("src.vector_search.base.QdrantClient")
-    def test_versioned_collections(self, mock_qdrant_client, mock_sentence_transformer):
+        self.assertTrue(enhanced_search.connect())
+
+        self.assertFalse(enhanced_search.prefer_grpc)
+        self.assertEqual(self.mock_qdrant_client.call_args.kwargs["prefer_grpc"], False)
+        self.assertEqual(self.mock_qdrant_client.call_count, 2)
+        self.assertIn("tenders", enhanced_search._known_collections)
+
+    def test_versioned_collections(self):
         """Test versioned collection functionality"""
-        # Mock the sentence transformer
-        mock_model = MagicMock()
-        mock_model.get_sentence_embedding_dimension.return_value = 384
-        mock_model.encode.return_value = np.array([0.1] * 384)
-        mock_sentence_transformer.return_value = mock_model
-        
-        # Mock the Qdrant client
-        mock_qdrant = MagicMock()
-        mock_qdrant_client.return_value = mock_qdrant
-        
+        mock_qdrant = self.mock_qdrant
+
         # Create EnhancedVectorSearch instance
         enhanced_search = EnhancedVectorSearch()
-        
+
         # Mock collection operations
         mock_qdrant.get_collection.side_effect = Exception("Collection not found")
-        mock_qdrant.create_collection.return_value = MagicMock()
-        mock_qdrant.upsert.return_value = MagicMock()
-        
-        # Test adding tender with version
+
+        # Test adding a tender to a versioned collection
         version = "v1.0"
-        tender_id = enhanced_search.preprocess_and_add_tender(
-            contract_metadata, 
-            tender_detail, 
-            version=version
-        )
-        
+        collection_name = enhanced_search.get_collection_name('tenders', version)
+        tender_id = 'N006/25/V00015462'
+        enhanced_search.add_items(collection_name, [{'id': tender_id, 'text': 'Modul Cisco', 'payload': {}}])
+
         # Verify versioned collection name was used
         expected_collection_name = f"tenders_{version}"
+        self.assertEqual(collection_name, expected_collection_name)
+        mock_qdrant.create_collection.assert_called_once()
+        self.assertEqual(mock_qdrant.upsert.call_args.kwargs['collection_name'], expected_collection_name)
         self.assertIn(expected_collection_name, enhanced_search.cache)
         self.assertIn(tender_id, enhanced_search.cache[expected_collection_name])
-        
-        # Verify collection name generation
-        collection_name = enhanced_search.get_collection_name('tenders', version)
-        self.assertEqual(collection_name, expected_collection_name)
 
-    @patch("src.vector_search.base.SentenceTransformer")  
-    @patch("src.vector_search.base.QdrantClient")
-    def test_update_tender_payload(self, mock_qdrant_client, mock_sentence_transformer):
-        """Test updating specific payload fields of a tender"""
-        # Mock the sentence transformer
-        mock_model = MagicMock()
-        mock_model.get_sentence_embedding_dimension.return_value = 384
-        mock_model.encode.return_value = np.array([0.1] * 384)
-        mock_sentence_transformer.return_value = mock_model
-        
-        # Mock the Qdrant client
-        mock_qdrant = MagicMock()
-        mock_qdrant_client.return_value = mock_qdrant
-        
-        # Create EnhancedVectorSearch instance
+        # Cached entries keep the FP16 vector but not the search text
+        cached_tender = enhanced_search.get_cached_item(expected_collection_name, tender_id)
+        self.assertNotIn('text', cached_tender)
+        self.assertEqual(cached_tender['vector'].dtype, np.float16)
+
+    def test_known_collections_skip_existence_check(self):
+        """Test that collection existence is checked only once per collection"""
+        mock_qdrant = self.mock_qdrant
+
         enhanced_search = EnhancedVectorSearch()
-        
-        # Mock collection operations for adding
-        mock_qdrant.get_collection.side_effect = Exception("Collection not found")
-        mock_qdrant.create_collection.return_value = MagicMock()
-        mock_qdrant.upsert.return_value = MagicMock()
-        mock_qdrant.set_payload.return_value = MagicMock()  # Mock set_payload instead of update_payload
-        
-        # Add a tender first
-        tender_id = enhanced_search.preprocess_and_add_tender(contract_metadata, tender_detail)
-        
-        # Test payload update
-        payload_updates = {
-            'status': 'closed',
-            'updated_date': '2025-06-11'
-        }
-        
-        updated_id = enhanced_search.update_tender_payload(tender_id, payload_updates)
-        
-        # Verify update was called
-        self.assertEqual(updated_id, tender_id)
-        # Check if either method was called (depending on implementation)
-        update_called = (mock_qdrant.set_payload.called or 
-                        mock_qdrant.update_payload.called if hasattr(mock_qdrant, 'update_payload') else 
-                        mock_qdrant.set_payload.called)
-        self.assertTrue(update_called, "Payload update method should have been called")
-        
-        # Verify cache was updated
-        collection_name = enhanced_search.get_collection_name('tenders')
-        cached_tender = enhanced_search.cache[collection_name][tender_id]
-        self.assertEqual(cached_tender['payload']['status'], 'closed')
-        self.assertEqual(cached_tender['payload']['updated_date'], '2025-06-11')
+
+        # Collection exists on the server
+        enhanced_search._ensure_collection_exists('tenders')
+        enhanced_search._ensure_collection_exists('tenders')
+        mock_qdrant.get_collection.assert_called_once_with('tenders')
+        mock_qdrant.create_collection.assert_not_called()
+
+        # Recreating the collection invalidates the cached entry until it is created again
+        enhanced_search.create_collection('tenders', force_recreate=True)
+        mock_qdrant.delete_collection.assert_called_once_with('tenders')
+        self.assertIn('tenders', enhanced_search._known_collections)
+
+    def test_add_items_encodes_each_batch_once(self):
+        """Test that add_items runs one encoder call per batch rather than per item"""
+        mock_model = MagicMock(wraps=_FakeModel())
+        self.mock_sentence_transformer.return_value = mock_model
+
+        mock_qdrant = self.mock_qdrant
+
+        enhanced_search = EnhancedVectorSearch()
+        items = [{'id': f'T{i}', 'text': f'tender {i}', 'payload': {'status': 'open'}} for i in range(5)]
+        added_ids = enhanced_search.add_items('tenders', items, batch_size=2)
+
+        self.assertEqual(added_ids, [item['id'] for item in items])
+        # 5 items in batches of 2 -> 3 encoder calls, each with a list of texts
+        self.assertEqual(mock_model.encode.call_count, 3)
+        self.assertEqual(mock_model.encode.call_args_list[0].args[0], ['tender 0', 'tender 1'])
+        self.assertEqual(mock_qdrant.upsert.call_count, 3)
+
+    def test_add_items_failure_keeps_earlier_cache(self):
+        """Test that a failed add_items caches only confirmed batches and waits for the pending upserts"""
+        finished = []
+        t2_started = threading.Event()
+
+        def upsert(collection_name, points, wait):
+            if points.ids == ['T1']:
+                # Fail only once T2 is running, so it is still in flight when the failure surfaces
+                t2_started.wait(timeout=5)
+                raise RuntimeError("upsert failed")
+            if points.ids == ['T2']:
+                t2_started.set()
+                time.sleep(0.2)
+            finished.append(points.ids[0])
+
+        self.mock_qdrant.upsert.side_effect = upsert
+        enhanced_search = EnhancedVectorSearch(max_in_flight=2)
+        enhanced_search.add_items('tenders', [{'id': 'T0', 'text': 'tender 0', 'payload': {}}])
+
+        items = [{'id': f'T{i}', 'text': f'tender {i}', 'payload': {}} for i in range(4)]
+        with self.assertRaises(RuntimeError):
+            enhanced_search.add_items('tenders', items, batch_size=1)
+
+        # T0 was stored by the earlier call, T1 failed, T2 was still in flight and T3 never queued
+        self.assertIsNotNone(enhanced_search.get_cached_item('tenders', 'T0'))
+        self.assertIsNone(enhanced_search.get_cached_item('tenders', 'T1'))
+        self.assertEqual(finished, ['T0', 'T0', 'T2'])
+
+    def test_bulk_add_items_restores_indexing_threshold(self):
+        """Test that bulk loading restores the collection's previous indexing threshold"""
+        mock_qdrant = self.mock_qdrant
+        mock_qdrant.get_collection.return_value.config.optimizer_config.indexing_threshold = 50000
+
+        enhanced_search = EnhancedVectorSearch()
+        items = [{'id': f'T{i}', 'text': f'tender {i}', 'payload': {}} for i in range(3)]
+        enhanced_search.bulk_add_items('tenders', items)
+
+        thresholds = [call.kwargs['optimizers_config'].indexing_threshold
+                      for call in mock_qdrant.update_collection.call_args_list]
+        self.assertEqual(thresholds, [0, 50000])
+
+        # A collection created in bulk mode has indexing disabled, it gets the default threshold
+        mock_qdrant.update_collection.reset_mock()
+        mock_qdrant.get_collection.return_value.config.optimizer_config.indexing_threshold = 0
+        enhanced_search.bulk_add_items('tenders', items)
+        self.assertEqual(mock_qdrant.update_collection.call_args.kwargs['optimizers_config'].indexing_threshold,
+                         DEFAULT_INDEXING_THRESHOLD)
+
+    def test_build_filter_is_cached(self):
+        """Test that equivalent filter dictionaries share one cached Filter object"""
+        first = EnhancedVectorSearch._build_filter({'status': 'open', 'cpv_code': ['32423000-4']})
+        second = EnhancedVectorSearch._build_filter({'cpv_code': ['32423000-4'], 'status': 'open'})
+        self.assertIs(first, second)
+        self.assertEqual(len(first.must), 2)
+
+        # Values of different types must not collide in the cache
+        self.assertIsNot(
+            EnhancedVectorSearch._build_filter({'is_framework': True}),
+            EnhancedVectorSearch._build_filter({'is_framework': 1})
+        )
+        self.assertIsNone(EnhancedVectorSearch._build_filter({}))
+
+    def test_build_filter_with_unhashable_values(self):
+        """Test that filters with nested unhashable values bypass the filter cache"""
+        # Qdrant only matches lists of strings or integers, so the uncached build rejects the value
+        # with its validation error instead of failing on the cache key
+        with self.assertRaises(ValidationError):
+            EnhancedVectorSearch._build_filter({'status': 'open', 'lots': [{'lot_id': 'L1'}]})
+
+    def test_query_embedding_is_cached(self):
+        """Test that repeated query texts are encoded only once across collections"""
+        mock_model = MagicMock(wraps=_FakeModel())
+        self.mock_sentence_transformer.return_value = mock_model
+
+        mock_qdrant = self.mock_qdrant
+        mock_qdrant.query_points.return_value = MagicMock(points=[])
+
+        enhanced_search = EnhancedVectorSearch()
+        enhanced_search.query_points('tenders_czech', 'IT services')
+        enhanced_search.query_points('tenders_english', ' IT services ')
+
+        mock_model.encode.assert_called_once_with('IT services', normalize_embeddings=True)
+        self.assertEqual(mock_qdrant.query_points.call_count, 2)
+
+    def test_query_similar_to_cached_item_skips_encoding(self):
+        """Test that searching with a cached item reuses its stored vector instead of re-encoding"""
+        mock_model = MagicMock(wraps=_FakeModel())
+        self.mock_sentence_transformer.return_value = mock_model
+
+        mock_qdrant = self.mock_qdrant
+        mock_qdrant.query_points.return_value = MagicMock(points=[])
+
+        enhanced_search = EnhancedVectorSearch()
+        enhanced_search.add_items('tenders', [{'id': 'T1', 'text': 'tender', 'payload': {}}])
+        enhanced_search.query_similar_to_item('companies', 'tenders', 'T1')
+
+        # Only the initial add encoded anything
+        self.assertEqual(mock_model.encode.call_count, 1)
+        query = mock_qdrant.query_points.call_args.kwargs['query']
+        np.testing.assert_allclose(query, _VEC, rtol=1e-3)
+
+        # Items not cached by this instance are looked up by Qdrant
+        enhanced_search.query_similar_to_item('companies', 'tenders', 'T2')
+        self.assertEqual(mock_model.encode.call_count, 1)
+        self.assertEqual(mock_qdrant.query_points.call_args.kwargs['query'], 'T2')
+        self.assertEqual(mock_qdrant.query_points.call_args.kwargs['lookup_from'].collection, 'tenders')
 
     def test_collection_name_generation(self):
         """Test collection name generation with and without versions"""
@@ -2,17 +2,20 @@
 import os
 import unittest
 
-from jnd_utils.log import init_logging
-
 from src.documents_parser import DocumentsParser, ParsedDocumentData
+from tests.log_helpers import quiet_class_logging
 from tests.mocks.mock_http_client import MockHttpClient
 
 
 class TestDocumentsParser(unittest.TestCase):
     TEST_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
+    @classmethod
+    def setUpClass(cls):
+        # Configure logging once per class, TEST_VERBOSE=1 shows the parser's INFO logs
+        quiet_class_logging(cls)
+
     def setUp(self):
-        init_logging()
         self.mock_client = MockHttpClient(self.TEST_DATA_PATH)
 
         # Define test document info for different file types
@@ -96,6 +99,16 @@ class TestDocumentsParser(unittest.TestCase):
             self.assertTrue(doc.path)  # Should have a path
             self.assertTrue(os.path.exists(doc.path))  # File should exist
 
+    def test_parse_multiple_documents_keeps_order(self):
+        """Test that documents downloaded concurrently are reported in input order."""
+        parser = DocumentsParser(self.docx_doc_info + self.pdf_doc_info, http_client=self.mock_client)
+
+        documents_data = parser.get_documents_data()
+
+        # Assertions
+        self.assertEqual([doc.id for doc in documents_data], ["2865511217", "2865511219"])
+        self.assertEqual([doc.type for doc in documents_data], ["docx", "pdf"])
+
     def test_get_full_data(self):
         """Test retrieving full data for a document by name."""
         pdf_parser = DocumentsParser(self.pdf_doc_info, http_client=self.mock_client)
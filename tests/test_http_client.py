@@ -0,0 +1,85 @@
+import glob
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+
+from src.utils.http_client import HttpClient
+
+FILE_URL = "https://nen.nipez.cz/file?id=2865511219"
+FILE_CONTENT = [b"%PDF-1.4 ", b"test document"]
+
+
+def _mock_response(*args, **kwargs):
+    """Streamed response with a known file name and content."""
+    response = MagicMock()
+    response.headers = {"content-disposition": 'attachment; filename="zadavaci_dokumentace.pdf"'}
+    response.iter_content.return_value = iter(FILE_CONTENT)
+    return response
+
+
+class TestHttpClientDownloadCache(unittest.TestCase):
+    """Test the on-disk download cache of HttpClient."""
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+        self.client = HttpClient(cache_dir=self.cache_dir)
+
+    def _read_and_remove(self, file_path: str) -> bytes:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        os.unlink(file_path)
+        return content
+
+    def test_cache_is_disabled_by_default(self):
+        """Test that downloads are not cached unless a cache directory is given"""
+        self.assertIsNone(HttpClient().cache_dir)
+
+    @patch("src.utils.http_client.requests.get", side_effect=_mock_response)
+    def test_cache_hit_skips_download(self, mock_get):
+        """Test that a second download of the same URL is served from the cache"""
+        first = self.client.download_file(FILE_URL)
+        second = self.client.download_file(FILE_URL)
+
+        mock_get.assert_called_once()
+        self.assertNotEqual(first, second)
+        self.assertTrue(first.endswith(".pdf"))
+        self.assertEqual(self._read_and_remove(first), b"".join(FILE_CONTENT))
+        self.assertEqual(self._read_and_remove(second), b"".join(FILE_CONTENT))
+        self.assertEqual(self.client.request_count, 1)
+
+    def test_concurrent_downloads_of_same_url(self):
+        """Test that concurrent downloads of one URL each get the complete file"""
+        workers = 4
+        # Every download waits for the others mid-file, so all partial files are open at the same time
+        barrier = threading.Barrier(workers)
+
+        def iter_content_in_lockstep(chunk_size):
+            yield FILE_CONTENT[0]
+            barrier.wait(timeout=5)
+            yield FILE_CONTENT[1]
+
+        def concurrent_response(*args, **kwargs):
+            response = _mock_response()
+            response.iter_content.side_effect = iter_content_in_lockstep
+            return response
+
+        with patch("src.utils.http_client.requests.get", side_effect=concurrent_response):
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                file_paths = list(executor.map(lambda _: self.client.download_file(FILE_URL), range(workers)))
+
+        self.assertEqual(len(set(file_paths)), workers)
+        for file_path in file_paths:
+            self.assertEqual(self._read_and_remove(file_path), b"".join(FILE_CONTENT))
+        # Partial files are all published, one completed entry is left in the cache
+        cache_files = glob.glob(os.path.join(self.cache_dir, "*", "*"))
+        self.assertEqual(len(cache_files), 1)
+        self.assertTrue(cache_files[0].endswith(".pdf"))
+
+
+if __name__ == "__main__":
+    unittest.main()
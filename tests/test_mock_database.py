@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import select
+
+from src.models.database import UnifiedContractRaw
+from tests.mocks.mock_database import TestDatabaseManager
+
+FIXTURE_FILE = 'unified_contracts_raw.json'
+
+
+@patch('tests.mocks.mock_database.TEST_DB_BACKEND', 'memory')
+class TestMemoryDatabase(unittest.TestCase):
+    """Test the in-memory SQLite backend of TestDatabaseManager (TEST_DB_BACKEND=memory)."""
+
+    def _create_manager(self):
+        manager = TestDatabaseManager()
+        self.addCleanup(manager.cleanup)
+        return manager, manager.create_test_database()
+
+    @staticmethod
+    def _contract(source_id):
+        return UnifiedContractRaw(source_system='NEN', source_id=source_id,
+                                  procurement_name='Modul Cisco - OB7125-044',
+                                  full_raw_data={'nen_system_number': source_id})
+
+    def test_session_round_trip(self):
+        """Test that rows written in one session are read back in the next"""
+        _, database = self._create_manager()
+
+        with database.session_manager() as session:
+            session.add(self._contract('N006/25/V00015462'))
+
+        with database.session_manager() as session:
+            contract = session.scalars(select(UnifiedContractRaw)).one()
+            self.assertEqual(contract.source_id, 'N006/25/V00015462')
+            self.assertEqual(contract.full_raw_data, {'nen_system_number': 'N006/25/V00015462'})
+
+    def test_databases_are_isolated(self):
+        """Test that every manager gets its own empty database"""
+        _, first = self._create_manager()
+        _, second = self._create_manager()
+
+        with first.session_manager() as session:
+            session.add(self._contract('N006/25/V00015462'))
+
+        with second.session_manager() as session:
+            self.assertEqual(session.scalars(select(UnifiedContractRaw)).all(), [])
+
+    def test_fixture_files_are_loaded(self):
+        """Test that the fixture files listed in tables_sources are loaded into the new database"""
+        data_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(data_dir.cleanup)
+        fixture = {'test_data': [
+            {'source_system': 'NEN', 'source_id': f'N006/25/V0001546{i}', 'full_raw_data': {}} for i in range(3)
+        ]}
+        with open(os.path.join(data_dir.name, FIXTURE_FILE), 'w') as file:
+            json.dump(fixture, file)
+
+        with patch('tests.mocks.mock_database.DATA_DIR', data_dir.name), \
+                patch('tests.mocks.mock_database.tables_sources', [(UnifiedContractRaw, FIXTURE_FILE)]):
+            _, database = self._create_manager()
+
+        with database.session_manager() as session:
+            source_ids = session.scalars(select(UnifiedContractRaw.source_id)).all()
+        self.assertEqual(sorted(source_ids), [record['source_id'] for record in fixture['test_data']])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,9 @@
 import os
 import unittest
 
-from jnd_utils.log import init_logging
-
 from src.documents_parser import DocumentsParser
 from src.scrapers.nen_scraper import NenScraper, NenContractDetail
+from tests.log_helpers import quiet_class_logging
 from tests.mocks.mock_database import TestDatabaseManager
 from tests.mocks.mock_http_client import MockHttpClient
 
@@ -16,15 +15,26 @@ class TestNenScraper(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up test resources once for all tests."""
-        init_logging()
+        # Scraper INFO logs for every parsed row are noise in test output, TEST_VERBOSE=1 restores them
+        quiet_class_logging(cls)
         cls.test_data_path = os.path.join(cls.TEST_DATA_PATH, "nen_mock_html")
-        os.makedirs(cls.test_data_path, exist_ok=True)
+        # The mock HTML is checked in; fail before starting the database if it is missing
+        if not os.path.isdir(cls.test_data_path):
+            raise FileNotFoundError(f"Mock HTML fixtures missing: {cls.test_data_path}")
 
         # Create test database ONCE for entire test class
         cls.db_manager = TestDatabaseManager()
         cls.test_database = cls.db_manager.create_test_database()
         cls.mock_client = MockHttpClient(cls.test_data_path)
-        print(f"Test database created: {os.environ.get('DB_NAME')}")
+        print(f"Test database created: {cls.db_manager.database_name}")
+
+        # NenScraper holds no state besides its query parameters, so the tests share one instance
+        cls.parser = NenScraper(
+            date_from="2025-05-06",
+            deadline="2025-05-06",
+            http_client=cls.mock_client,
+            database=cls.test_database
+        )
 
     @classmethod
     def tearDownClass(cls):
@@ -33,42 +43,28 @@ class TestNenScraper(unittest.TestCase):
             cls.db_manager.cleanup()
         print("Test database cleaned up")
 
-    def setUp(self):
-        """Set up resources for each test."""
-        # Use the shared test database instance
-        self.parser = NenScraper(
-            date_from="2025-05-06",
-            deadline="2025-05-06",
-            http_client=self.mock_client,
-            database=self.test_database  # Use class-level database
-        )
-
-    def tearDown(self):
-        """Clean up database after each test."""
-        if hasattr(self, 'db_manager'):
-            self.db_manager.cleanup()
-
     def test_get_all_items_on_page(self):
         """Test parsing multiple contracts from a listing page."""
         items = self.parser.get_all_items_on_page()
         self.assertEqual(len(items), 50)
 
-        # Verify first item details
-        first_item = items[0]
-        self.assertEqual(first_item['system_number'], 'N006/25/V00011701')
-        self.assertEqual(first_item['title'],
-                         'KŘP KvK - NPO - Sokolov, Jednoty 1773 - energeticky úsporná opatření, reg. č. 4181000033')
-        self.assertEqual(first_item['status'], 'Not terminated')
-        self.assertEqual(first_item['contracting_authority'], 'Krajské ředitelství policie Karlovarského kraje')
-        self.assertEqual(first_item['deadline'], '05/09/2025, 10:00 AM')
-
-        # Verify last item details
-        last_item = items[-1]
-        self.assertEqual(last_item['system_number'], 'N006/25/V00015367')
-        self.assertEqual(last_item['title'], 'Mediální poradenství pro CzechTourism')
-        self.assertEqual(last_item['status'], 'Not terminated')
-        self.assertEqual(last_item['contracting_authority'], 'Česká centrála cestovního ruchu - CzechTourism')
-        self.assertEqual(last_item['deadline'], '05/27/2025, 09:00 AM')
+        # Verify first and last item details; one comparison per item reports every differing field
+        expected_first = {
+            'system_number': 'N006/25/V00011701',
+            'title': 'KŘP KvK - NPO - Sokolov, Jednoty 1773 - energeticky úsporná opatření, reg. č. 4181000033',
+            'status': 'Not terminated',
+            'contracting_authority': 'Krajské ředitelství policie Karlovarského kraje',
+            'deadline': '05/09/2025, 10:00 AM',
+        }
+        expected_last = {
+            'system_number': 'N006/25/V00015367',
+            'title': 'Mediální poradenství pro CzechTourism',
+            'status': 'Not terminated',
+            'contracting_authority': 'Česká centrála cestovního ruchu - CzechTourism',
+            'deadline': '05/27/2025, 09:00 AM',
+        }
+        for item, expected in ((items[0], expected_first), (items[-1], expected_last)):
+            self.assertEqual({key: item.get(key) for key in expected}, expected)
 
     def test_parse_contract_detail(self):
         """Test parsing contract detail and saving to real database."""
@@ -87,26 +83,29 @@ class TestNenScraper(unittest.TestCase):
         self.assertIsInstance(contract_detail, NenContractDetail)
 
         # Basic Information assertions
-        self.assertEqual(contract_detail.nen_system_number, 'N006/25/V00015462')
-        self.assertEqual(contract_detail.procurement_procedure_name, 'Modul Cisco - OB7125-044')
-        self.assertEqual(contract_detail.contracting_authority, 'Ministerstvo zahraničních věcí')
-        self.assertEqual(contract_detail.current_status_of_the_procurement_procedure, 'Not terminated')
-        self.assertEqual(contract_detail.division_into_lots, 'No')
-        self.assertEqual(contract_detail.procurement_procedure_type, 'Otevřená výzva')
-        self.assertEqual(contract_detail.specifications_of_the_procurement_procedure, 'otevřená výzva')
-        self.assertEqual(contract_detail.type, 'Public supply contract')
+        expected_detail = {
+            'nen_system_number': 'N006/25/V00015462',
+            'procurement_procedure_name': 'Modul Cisco - OB7125-044',
+            'contracting_authority': 'Ministerstvo zahraničních věcí',
+            'current_status_of_the_procurement_procedure': 'Not terminated',
+            'division_into_lots': 'No',
+            'procurement_procedure_type': 'Otevřená výzva',
+            'specifications_of_the_procurement_procedure': 'otevřená výzva',
+            'type': 'Public supply contract',
+        }
+        self.assertEqual({field: getattr(contract_detail, field) for field in expected_detail}, expected_detail)
 
         # Test saving to real database
         self.parser.save_contract_detail(contract_detail)
 
         # contract_detail_filtered = contract_detail.filter_for_llm_parsing()
 
-        # Uncomment when ready to test LLM extraction
+        # Uncomment when ready to test LLM extraction; it calls a live LLM API, so move it into its own
+        # test marked @pytest.mark.llm that runs only with RUN_LLM_TESTS=1 (see pytest.ini)
         # extractor = TenderExtractor()
         # extracted = extractor.process(doc_data, contract_detail_filtered)
         # print(extracted)
 
 
 if __name__ == "__main__":
-    init_logging()
     unittest.main()
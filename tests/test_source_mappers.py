@@ -0,0 +1,62 @@
+import unittest
+from datetime import datetime
+
+from src.processors.source_mappers import NenMapper, DATETIME_FORMATS
+
+
+class TestParseDatetime(unittest.TestCase):
+    """Test date parsing of the source mappers"""
+
+    def setUp(self):
+        self.mapper = NenMapper()
+
+    def test_supported_formats(self):
+        """Test one example of every supported format"""
+        expected = {
+            '05/26/2025, 09:00 AM': datetime(2025, 5, 26, 9, 0),
+            '26/05/2025, 09:00 PM': datetime(2025, 5, 26, 21, 0),
+            '2025-05-26 09:00:00': datetime(2025, 5, 26, 9, 0),
+            '2025-05-26': datetime(2025, 5, 26),
+            '26.05.2025 09:00': datetime(2025, 5, 26, 9, 0),
+            '26.05.2025': datetime(2025, 5, 26),
+            '15. 05. 2025 09:30': datetime(2025, 5, 15, 9, 30),
+        }
+        for date_str, expected_datetime in expected.items():
+            with self.subTest(date_str=date_str):
+                self.assertEqual(self.mapper._parse_datetime(date_str), expected_datetime)
+
+    def test_space_padded_fields(self):
+        """Test that space-padded fields strptime accepts are not rejected by the shape patterns"""
+        expected = {
+            '2025-05- 6': datetime(2025, 5, 6),
+            ' 5.05.2025': datetime(2025, 5, 5),
+            '05/ 6/2025, 09:00 AM': datetime(2025, 5, 6, 9, 0),
+            '05/06/2025,  9:00 AM': datetime(2025, 5, 6, 9, 0),
+        }
+        for date_str, expected_datetime in expected.items():
+            with self.subTest(date_str=date_str):
+                self.assertEqual(self.mapper._parse_datetime(date_str), expected_datetime)
+
+    def test_patterns_accept_everything_strptime_parses(self):
+        """Test that no input strptime can parse is filtered out by its shape pattern"""
+        samples = [
+            '5/6/2025, 9:00 am', '2025-5-6', '2025-05-26  09:00:00', '6.5.2025 9:05', '15.  5. 2025 09:30',
+        ]
+        for date_str in samples:
+            for pattern, fmt in DATETIME_FORMATS:
+                try:
+                    datetime.strptime(date_str, fmt)
+                except ValueError:
+                    continue
+                with self.subTest(date_str=date_str, fmt=fmt):
+                    self.assertIsNotNone(pattern.fullmatch(date_str))
+
+    def test_unparseable_dates(self):
+        """Test that unknown formats and empty values give None"""
+        for date_str in ('', None, 'next Monday', '2025/05/26'):
+            with self.subTest(date_str=date_str):
+                self.assertIsNone(self.mapper._parse_datetime(date_str))
+
+
+if __name__ == "__main__":
+    unittest.main()